@@ -1,18 +1,18 @@
-import pygame
+from assets import ASSETS
 
 class ParallaxBackground:
-    def __init__(self, image_path, screen_w, screen_h, scroll_speed=0.5):
+    def __init__(self, image_path, screen_w, screen_h, scroll_speed=0.5, render_scale=1, assets=None):
         # Load and scale to screen size
-        raw_img = pygame.image.load(image_path).convert_alpha()
-        self.image = pygame.transform.scale(raw_img, (screen_w, screen_h))
+        self.image = (ASSETS if assets is None else assets).image(image_path, size=(screen_w, screen_h))
         
         self.width = screen_w
         self.scroll_speed = scroll_speed # 0.5 means half camera speed
+        self.render_scale = render_scale # camera_x is in world pixels
 
     def draw(self, surface, camera_x):
         # Calculate offset based on camera
         # The modulo (%) operator handles the "endless" looping math
-        offset = (camera_x * self.scroll_speed) % self.width
+        offset = (camera_x * self.render_scale * self.scroll_speed) % self.width
         
         # Draw two copies of the image to cover the gap while looping
         surface.blit(self.image, (-offset, 0))
@@ -1,106 +1,338 @@
+import argparse
+import os
+import sys
+import time
 import pygame
 from mapdraw import Mapdraw
 from Player import Player
 from Background import ParallaxBackground
 from UI import GameUI
 from moving_platform import MovingPlatform
-
-pygame.init()
+from game_loop import FixedTimestep
+from simulation import Simulation
+from replay import Recorder, Replay
+from frame_profiler import FrameProfiler
+from profiler_overlay import ProfilerOverlay
+from input_state import InputMapper
+from assets import ASSETS
+from asset_cache import DiskCache
+from atlas import AtlasBuilder
 
 TILE_SIZE = 16
 SCALE = 4
 
-screen = pygame.display.set_mode((0,0), pygame.FULLSCREEN)
-pygame.display.set_caption("Purple Core")
-SW, SH = screen.get_size()
-
-# 1. Load Map
-Forest_map = Mapdraw("Forest_stage.png", "Forest_map.csv", (255,255,255), TILE_SIZE, SCALE)
-Forest_map_width, Forest_map_height = Forest_map.map_size()
-Forest_map_tile_properties = Forest_map.tile_properties()
-
-# 2. Initialize Player
-player = Player(
-    x=3*(TILE_SIZE*SCALE), 
-    y=0, 
-    spritesheet="Purple_core_player.png", 
-    colorkey=(0, 255, 0), 
-    scale=SCALE//2, 
-    tilesize=48
-)
-ui = GameUI(player, "UI_stuff.png")
-
-# 4. Camera & Deadzone Setup
-camera_x = player.hitbox.centerx - SW // 2
-camera_y = player.hitbox.centery - SH // 2
-
-# Define the "Deadzone" buffer. 
-# The camera only moves if the player is outside this center box.
-deadzone_width = 200  # Horizontal buffer
-deadzone_height = 150 # Vertical buffer
-deadzone = pygame.Rect((SW - deadzone_width) // 2, (SH - deadzone_height) // 2, deadzone_width, deadzone_height)
-
-moving_platforms = [
-    MovingPlatform("Forest_moving_platform.png",(70*(TILE_SIZE*SCALE),29*(TILE_SIZE*SCALE)),(90*(TILE_SIZE*SCALE),29*(TILE_SIZE*SCALE)),speed=4,width=32,height=16,scale=SCALE,frames_count=1)
+# The simulation always runs at TICK_RATE, FPS only caps how often we draw (0 = uncapped)
+TICK_RATE = 60
+MAX_TICKS_PER_FRAME = 5
+FPS = 60
+
+# Every sheet the Forest stage cuts from, with its sheet colorkey, decoded
+# up front on PRELOAD_WORKERS threads (0 = decode each one when first needed)
+STAGE_SHEETS = [
+    ("Forest_stage.png", None),
+    ("Purple_core_player.png", None),
+    ("UI_stuff.png", None),
+    ("Forest_moving_platform.png", (0, 255, 0)),
+    ("Forest_stage_background.png", None),
 ]
+PRELOAD_WORKERS = 4
 
-background = ParallaxBackground("Forest_stage_background.png", SW, SH, scroll_speed=0.5)
+# Pack the player, UI and platform frames into shared atlas pages: 49
+# Surfaces become 2, but a plain keyed page still blits about 2.5x slower
+# than separate RLE'd Surfaces in SDL's software renderer (benchmarks/bench_atlas)
+PACK_SPRITES = False
 
-clock = pygame.time.Clock()
-FPS = 60
+# World px around the view that still counts as on screen when culling entities
+CULL_MARGIN = 64
+
+# Profiler hotkeys: overlay, dump the buffered frames as a Chrome trace, cProfile the next frames
+PROFILE_OVERLAY_KEY = pygame.K_F3
+TRACE_DUMP_KEY = pygame.K_F9
+CPROFILE_KEY = pygame.K_F10
+CPROFILE_FRAMES = 300
+
+class Game:
+    def __init__(self, screen=None, low_res=False, tick_rate=TICK_RATE, fps=FPS, asset_cache=True,
+                 preload_workers=PRELOAD_WORKERS):
+        if screen is None:
+            screen = pygame.display.set_mode((0,0), pygame.FULLSCREEN)
+        pygame.display.set_caption("Purple Core")
+        self.screen = screen
+        SW, SH = self.SW, self.SH = screen.get_size()
+
+        # Render mode: "native" draws everything at SCALE straight onto the screen,
+        # "lowres" draws the world 1:1 into a small offscreen surface and scales that
+        # up by SCALE once per frame (about 16x fewer pixels blitted).
+        self.low_res = low_res
+        rs = self.render_scale = 1 / SCALE if low_res else 1
+        if low_res:
+            # Integer upscale only, a few border pixels stay black when SW/SH don't divide by SCALE
+            self.target = pygame.Surface((SW // SCALE, SH // SCALE)).convert()
+            tw, th = self.target.get_size()
+            self.upscale_dest = screen.subsurface(((SW - tw * SCALE) // 2, (SH - th * SCALE) // 2, tw * SCALE, th * SCALE))
+            self.view_w, self.view_h = self.upscale_dest.get_size()
+        else:
+            self.target = screen
+            self.view_w, self.view_h = SW, SH
+
+        # Everything this stage loads goes through one scope, unload() lets go of it.
+        # Processed images are kept on disk so the next start skips decoding and scaling.
+        if asset_cache and ASSETS.disk is None:
+            ASSETS.disk = DiskCache()
+        self.assets = ASSETS.scope()
+        # Each render mode cuts its own images, the cache remembers which per mode
+        self.cache_mode = f"{'lowres' if low_res else 'native'} {SW}x{SH}"
+        sheets = (self.assets.preload(STAGE_SHEETS, preload_workers, self.draw_loading, self.cache_mode)
+                  if preload_workers else [])
+
+        # 1. Load Map
+        self.map_file = "Forest_map.csv"
+        self.Forest_map = Mapdraw("Forest_stage.png", self.map_file, (255,255,255), TILE_SIZE, SCALE, render_scale=rs, assets=self.assets)
+        self.map_width, self.map_height = self.Forest_map.map_size()
+        self.tile_properties = self.Forest_map.tile_properties()
+        self.collision = self.Forest_map.compile_collision(self.tile_properties)
+
+        # Player, UI and platform frames can share a few atlas pages, see PACK_SPRITES
+        self.atlas = AtlasBuilder() if PACK_SPRITES else None
+
+        # 2. Initialize Player
+        self.player = Player(
+            x=3*(TILE_SIZE*SCALE),
+            y=0,
+            spritesheet="Purple_core_player.png",
+            colorkey=(0, 255, 0),
+            scale=SCALE//2,
+            tilesize=48,
+            render_scale=rs,
+            assets=self.assets,
+            atlas=self.atlas
+        )
+        self.ui = GameUI(self.player, "UI_stuff.png", render_scale=rs, assets=self.assets, atlas=self.atlas)
+
+        # 4. Camera & Deadzone Setup
+        self.camera_x = self.player.hitbox.centerx - self.view_w // 2
+        self.camera_y = self.player.hitbox.centery - self.view_h // 2
+        self.prev_camera = (self.camera_x, self.camera_y)
+
+        # Define the "Deadzone" buffer.
+        # The camera only moves if the player is outside this center box.
+        deadzone_width = 200  # Horizontal buffer
+        deadzone_height = 150 # Vertical buffer
+        self.deadzone = pygame.Rect((self.view_w - deadzone_width) // 2, (self.view_h - deadzone_height) // 2, deadzone_width, deadzone_height)
+
+        self.moving_platforms = [
+            MovingPlatform("Forest_moving_platform.png",(70*(TILE_SIZE*SCALE),29*(TILE_SIZE*SCALE)),(90*(TILE_SIZE*SCALE),29*(TILE_SIZE*SCALE)),speed=4,width=32,height=16,scale=SCALE,frames_count=1,render_scale=rs,assets=self.assets,atlas=self.atlas)
+        ]
+        if self.atlas is not None:
+            # The frames live on the atlas pages now, the separate images can go
+            for image in self.atlas.build():
+                self.assets.release(image)
+
+        self.background = ParallaxBackground("Forest_stage_background.png", self.target.get_width(), self.target.get_height(), scroll_speed=0.5, render_scale=rs, assets=self.assets)
+
+        # Keys are read once per tick, everything downstream sees the snapshot
+        self.input = InputMapper()
+
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.timestep = FixedTimestep(tick_rate, MAX_TICKS_PER_FRAME)
+        # Phase timings for the last 10 s of frames, F3 shows them
+        self.profiler = FrameProfiler(capacity=600)
+        self.profiler_overlay = ProfilerOverlay(self.profiler, budget_ms=1000 / (fps or tick_rate))
+        # The same physics the headless runs use, on the game's clock
+        self.sim = Simulation(self.collision, self.player, self.moving_platforms, SH, self.timestep, self.profiler)
+        self.recorder = None
+        self.replay_inputs = None   # iterator of snapshots that stands in for the keyboard
+        self.running = True
+
+        # Everything's cut, the sheets only stay resident if a SpriteSheet still holds them
+        for sheet in sheets:
+            self.assets.release(sheet)
+        # First run on this machine (or after an art change): save what got cut
+        if ASSETS.disk is not None:
+            ASSETS.disk.flush(self.cache_mode)
+
+    def draw_loading(self, done, total, path):
+        """Progress bar while the stage's sheets decode."""
+        pygame.event.pump()  # keep the window responsive
+        screen = self.screen
+        screen.fill((0, 0, 0))
+        bar = pygame.Rect(0, 0, screen.get_width() // 3, 16)
+        bar.center = screen.get_rect().center
+        pygame.draw.rect(screen, (120, 80, 160), bar, 2)
+        fill = bar.inflate(-6, -6)
+        fill.width = fill.width * done // max(total, 1)
+        pygame.draw.rect(screen, (180, 120, 230), fill)
+        pygame.display.flip()
+
+    def tick(self, inputs=None):
+        """Advance the simulation by exactly one fixed step.
+
+        inputs is an InputSnapshot, by default the keyboard is polled.
+        """
+        if inputs is None and self.replay_inputs is not None:
+            inputs = next(self.replay_inputs, None)
+            if inputs is None:
+                self.running = False  # replay finished
+                return
+        if inputs is None:
+            inputs = self.input.poll()
+        self.prev_camera = (self.camera_x, self.camera_y)
+        # --- UPDATE PHYSICS ---
+        self.sim.step(inputs)
+        if self.recorder:
+            self.recorder.record(inputs)
+        with self.profiler.phase("camera"):
+            self.update_camera()
+
+    def start_recording(self):
+        self.recorder = Recorder(self.sim, self.map_file)
+
+    def play_replay(self, replay):
+        """Drive the game from a Replay instead of the keyboard."""
+        # The fall-out-of-the-world line depends on screen height, use the recorded one
+        self.sim.screen_h = replay.header["screen_h"]
+        self.replay_inputs = replay.inputs()
+
+    def unload(self):
+        """Release the stage's sheets and images, whatever nothing else holds is freed."""
+        self.assets.release_all()
+
+    def update_camera(self):
+        # --- CAMERA LOGIC (With Buffer/Deadzone) ---
+        player, deadzone = self.player, self.deadzone
+
+        # Get player's position relative to the camera
+        player_screen_x = player.hitbox.centerx - self.camera_x
+        player_screen_y = player.hitbox.centery - self.camera_y
+
+        # Check Horizontal Buffer
+        if player_screen_x < deadzone.left:
+            self.camera_x -= deadzone.left - player_screen_x
+        elif player_screen_x > deadzone.right:
+            self.camera_x += player_screen_x - deadzone.right
+
+        # Check Vertical Buffer
+        if player_screen_y < deadzone.top:
+            self.camera_y -= deadzone.top - player_screen_y
+        elif player_screen_y > deadzone.bottom:
+            self.camera_y += player_screen_y - deadzone.bottom
+
+        # --- CAMERA CLAMPING ---
+        # Prevents showing the "void" outside the map
+        self.camera_x = max(0, min(self.camera_x, self.map_width - self.view_w))
+        self.camera_y = max(0, min(self.camera_y, self.map_height - self.view_h))
+
+    def render(self, alpha=1.0):
+        """Draw the world blended alpha (0-1) of the way from the previous tick to the current one."""
+        target, phase = self.target, self.profiler.phase
+
+        # --- FINAL DRAWING ---
+        prev_x, prev_y = self.prev_camera
+        render_x = int(prev_x + (self.camera_x - prev_x) * alpha)
+        render_y = int(prev_y + (self.camera_y - prev_y) * alpha)
+
+        with phase("background.draw"):
+            self.background.draw(target, render_x)
+        with phase("map.draw"):
+            self.Forest_map.draw(target, render_x, render_y)
+        with phase("platforms.draw"):
+            # Only what's on screen, with a margin for the interpolation
+            m = CULL_MARGIN
+            target.blits([plat.blit_args(render_x, render_y, alpha)
+                          for plat in self.sim.entities.query_box(render_x - m, render_y - m,
+                                                                  render_x + self.view_w + m, render_y + self.view_h + m)],
+                         doreturn=False)
+        with phase("player.draw"):
+            self.player.draw(target, render_x, render_y, alpha)
+
+        with phase("ui.draw"):
+            self.ui.draw(target)
+
+        if self.low_res:
+            with phase("upscale"):
+                pygame.transform.scale(target, self.upscale_dest.get_size(), self.upscale_dest)
+
+        # Drawn at full screen resolution so the text stays readable in low-res mode
+        with phase("overlay"):
+            self.profiler_overlay.draw(self.screen)
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.running = False
+                elif event.key == PROFILE_OVERLAY_KEY:
+                    self.profiler_overlay.toggle()
+                elif event.key == TRACE_DUMP_KEY:
+                    path = time.strftime("trace_%Y%m%d_%H%M%S.json")
+                    frames = self.profiler.export_chrome_trace(path)
+                    print(f"profiler: wrote {frames} frames to {path}")
+                elif event.key == CPROFILE_KEY:
+                    self.profiler.profile_next(CPROFILE_FRAMES, time.strftime("profile_%Y%m%d_%H%M%S.prof"))
+
+    def step(self, ticks, inputs=None):
+        """Run the simulation without drawing, as fast as it goes.
+
+        inputs is an optional iterable of InputSnapshots, one per tick.
+        """
+        inputs = iter(inputs) if inputs is not None else None
+        for _ in range(ticks):
+            self.tick(next(inputs) if inputs is not None else None)
+
+    def run(self, max_frames=None, frame_ms=None):
+        """The main loop. max_frames stops it early, frame_ms makes every frame
+        count as that many ms instead of what the clock says (scripted runs)."""
+        prof = self.profiler
+        self.clock.tick()
+        frames = 0
+        while self.running and (max_frames is None or frames < max_frames):
+            frames += 1
+            prof.begin_frame()
+            with prof.phase("events"):
+                self.handle_events()
+
+            with prof.phase("clock.wait"):
+                elapsed = self.clock.tick(self.fps) if self.fps else self.clock.tick()
+            if frame_ms is not None:
+                elapsed = frame_ms
+            for _ in range(self.timestep.advance(elapsed)):
+                self.tick()
+                if not self.running: break
+
+            self.render(self.timestep.alpha)
+            with prof.phase("display.flip"):
+                pygame.display.flip()
+            prof.end_frame()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Purple Core")
+    parser.add_argument("--lowres", action="store_true", default=os.environ.get("PURPLE_CORE_RENDER") == "lowres",
+                        help="draw the world at pixel-art resolution and upscale once per frame")
+    parser.add_argument("--fps", type=int, default=FPS, help="render frame cap, 0 for uncapped")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="simulation ticks per second (physics is tuned for 60)")
+    parser.add_argument("--record", metavar="PATH", help="save this run's inputs as a replay")
+    parser.add_argument("--replay", metavar="PATH", help="play a recorded replay instead of reading the keyboard")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    game = Game(low_res=args.lowres, tick_rate=args.tick_rate, fps=args.fps)
+    if args.record:
+        game.start_recording()
+    if args.replay:
+        replay = Replay.load(args.replay)
+        game.play_replay(replay)
+    game.run()
+    if args.record:
+        game.recorder.save(args.record)
+        print(f"recorded {len(game.recorder.masks)} ticks to {args.record}")
+    if args.replay:
+        match = game.sim.state_hash() == replay.header.get("final_hash")
+        print(f"replay {'matches' if match else 'does NOT match'} the recorded final state")
+    game.unload()
+    pygame.quit()
 
-run = True
-
-while run:
-    # --- RENDER BACKGROUND ---
-    background.draw(screen, camera_x) 
-    
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            run = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                run = False
-    for plat in moving_platforms:
-        plat.update()
-    # --- UPDATE PHYSICS ---
-    player.update(Forest_map.grid, Forest_map.tile_size, Forest_map_tile_properties, SH, moving_platforms)
-
-    # --- CAMERA LOGIC (With Buffer/Deadzone) ---
-    
-    # Get player's position relative to the camera
-    player_screen_x = player.hitbox.centerx - camera_x
-    player_screen_y = player.hitbox.centery - camera_y
-
-    # Check Horizontal Buffer
-    if player_screen_x < deadzone.left:
-        camera_x -= deadzone.left - player_screen_x
-    elif player_screen_x > deadzone.right:
-        camera_x += player_screen_x - deadzone.right
-
-    # Check Vertical Buffer
-    if player_screen_y < deadzone.top:
-        camera_y -= deadzone.top - player_screen_y
-    elif player_screen_y > deadzone.bottom:
-        camera_y += player_screen_y - deadzone.bottom
-
-    # --- CAMERA CLAMPING ---
-    # Prevents showing the "void" outside the map
-    camera_x = max(0, min(camera_x, Forest_map_width - SW))
-    camera_y = max(0, min(camera_y, Forest_map_height - SH))
-
-    # --- FINAL DRAWING ---
-    render_x = int(camera_x)
-    render_y = int(camera_y)
-
-    Forest_map.draw(screen, render_x, render_y)
-    for plat in moving_platforms:
-        plat.draw(screen, render_x, render_y)
-    player.draw(screen, render_x, render_y)
-
-    ui.draw(screen)
-
-    pygame.display.flip()
-    clock.tick(FPS)
-
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,25 +1,29 @@
-import pygame
+from atlas import sprite
 from spritesheet import SpriteSheet
 
 class GameUI:
-    def __init__(self, player, spritesheet_path):
+    def __init__(self, player, spritesheet_path, render_scale=1, assets=None, atlas=None):
         self.player = player
-        self.ui_ss = SpriteSheet(spritesheet_path)
+        self.ui_ss = SpriteSheet(spritesheet_path, assets=assets)
+        self.render_scale = render_scale
         
         # Pulling from your coordinates: (0,0) Alive, (16,0) Dead
-        # Scaling to 3 makes them 48x48 pixels, which looks good on high res
-        self.full_heart = self.ui_ss.get_image(0, 0, 16, 16, 0,3)
-        self.dead_heart = self.ui_ss.get_image(16, 0, 16, 16, 0,3)
+        # Scaling to 3 makes them 48x48 pixels, which looks good on high res.
+        # In a low-res target they stay at least 1:1 so the pixels don't get dropped.
+        scale = max(1, round(3 * render_scale))
+        self.full_heart = sprite(self.ui_ss.get_image(0, 0, 16, 16, 0,scale), atlas)
+        self.dead_heart = sprite(self.ui_ss.get_image(16, 0, 16, 16, 0,scale), atlas)
+        self._blits = []
 
     def draw(self, screen):
-        start_x = 30
-        start_y = 30
-        spacing = 10
-        
+        start_x = start_y = max(1, round(30 * self.render_scale))
+        spacing = max(1, round(10 * self.render_scale))
+
+        # All the hearts in one call, out of the atlas page they share
+        blits = self._blits
+        blits.clear()
         for i in range(self.player.max_hearts):
             x_pos = start_x + (i * (self.full_heart.get_width() + spacing))
-            
-            if i < self.player.current_hearts:
-                screen.blit(self.full_heart, (x_pos, start_y))
-            else:
-                screen.blit(self.dead_heart, (x_pos, start_y))
\ No newline at end of file
+            heart = self.full_heart if i < self.player.current_hearts else self.dead_heart
+            blits.append((heart.surface, (x_pos, start_y), heart.rect))
+        screen.blits(blits, doreturn=False)
\ No newline at end of file
@@ -0,0 +1,289 @@
+"""Processed sprite images on disk, so later starts skip decoding and scaling.
+
+    SDL_VIDEODRIVER=dummy python -m asset_cache [--size 1920x1080] [--clear]
+
+Every source image gets a SOURCE.pcsprites next to it, like .pcmap for maps.
+The first run that cuts an image from it writes it out, or run the module to
+build the caches for both render modes up front.
+
+File layout (little-endian):
+    HEADER  magic, version, source mtime_ns, size and sha1, the sheet's
+            width and height, length of the JSON that follows
+    JSON    {params: [offset, width, height, colorkey, kind]}
+    pixels  every image's raw 32-bit pixels, 8 byte aligned
+
+params are the processing arguments AssetManager.image() got (source rect,
+scale, size, colorkeys, rotation, flip) plus PROCESS_VERSION, so changing
+how images get cut throws the old ones away (they're dropped the next time
+the file gets written). Images stretched to a size= are only kept for the
+last MAX_STRETCHED sizes, each window size would otherwise leave another
+full-screen background behind. Loading maps the file and
+wraps each image with pygame.image.frombuffer, nothing gets decoded or
+scaled. kind is what assets.optimize() made of it, translucent images are
+used straight from the mapping, opaque and colorkeyed ones get one
+convert() copy since the display format blits faster and RLE can't encode
+a buffer it doesn't own.
+
+MANIFEST lists, per render mode, the images each source gave that mode on
+its last run, so AssetManager.preload() can tell a source it doesn't have
+to decode from one the cache only has the other mode's images of.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+import pygame
+
+from assets import kind
+from maploader import source_hash, align
+
+MAGIC = b"PCSPRITE"
+VERSION = 2
+HEADER = struct.Struct("<8sHQQ20sIII")   # magic, version, mtime_ns, size, sha1, sheet w, sheet h, json length
+SUFFIX = ".pcsprites"
+MANIFEST = "preload.pcmanifest"   # JSON, {mode: {source path: [params keys]}}
+PIXELS = "BGRA"   # byte order of 32-bit ARGB, what convert_alpha() gives on most displays
+# Bump when assets.cut_image changes what comes out
+PROCESS_VERSION = 3
+# size= images kept per source, enough for both render modes at one window size
+MAX_STRETCHED = 2
+
+def params_key(params):
+    return json.dumps([PROCESS_VERSION, params], separators=(",", ":"))
+
+class SheetCache:
+    """The cached images of one source file."""
+    def __init__(self, path):
+        self.path = path
+        self.cache_path = path + SUFFIX
+        self.entries = {}   # params key -> (offset, w, h, colorkey, kind)
+        self.sheet_size = None
+        self.mm = None
+        self.pending = {}   # params key -> Surface, cut this run and not written yet
+        self.used = set()   # keys get() found on disk this run
+        self._read()
+
+    def _read(self):
+        try:
+            st = os.stat(self.path)
+            with open(self.cache_path, 'rb') as f:
+                magic, version, mtime_ns, size, digest, w, h, length = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC or version != VERSION or size != st.st_size:
+                    return
+                if mtime_ns != st.st_mtime_ns:
+                    # Touched but maybe not edited (checkouts, copies), the hash decides
+                    if digest != source_hash(self.path):
+                        return   # edited since, rebuilt on the next flush
+                    self._refresh_mtime(st, digest, w, h, length)
+                index = json.loads(f.read(length))
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError, struct.error):
+            return   # missing, truncated or unreadable, same as empty
+        self.sheet_size = (w, h)
+        self.entries = {k: tuple(v) for k, v in index.items()}
+
+    def _refresh_mtime(self, st, digest, w, h, length):
+        try:
+            with open(self.cache_path, 'r+b') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, st.st_mtime_ns, st.st_size, digest, w, h, length))
+        except OSError:
+            pass
+
+    def __contains__(self, key):
+        return key in self.entries or key in self.pending
+
+    def get(self, key, native_masks):
+        entry = self.entries.get(key)
+        if entry is None:
+            return self.pending.get(key)
+        self.used.add(key)
+        offset, w, h, colorkey, image_kind = entry
+        image = pygame.image.frombuffer(memoryview(self.mm)[offset:offset + w * h * 4], (w, h), PIXELS)
+        if image_kind != "alpha":
+            image = image.convert()
+            if image_kind == "colorkey":
+                image.set_colorkey(colorkey, pygame.RLEACCEL)
+            return image
+        if image.get_masks() != native_masks:
+            image = image.convert_alpha()   # another pixel format on this display
+        image.set_colorkey(colorkey)
+        return image
+
+    def write(self):
+        # Images already on disk come along, the mapping of the old file stays valid after the replace.
+        # The index is kept oldest first: ones not used this run, used ones, then the new ones
+        st = os.stat(self.path)
+        keys = [k for k in self.entries if k not in self.pending and json.loads(k)[0] == PROCESS_VERSION]
+        keys.sort(key=lambda k: k in self.used)
+        keys += list(self.pending)
+        stretched = [k for k in keys if json.loads(k)[1][6] is not None]   # params[6] is size
+        dropped = set(stretched[:-MAX_STRETCHED])
+        keys = [k for k in keys if k not in dropped]
+
+        blobs, meta = {}, {}
+        for k in keys:
+            if k in self.pending:
+                continue
+            o, w, h, ck, image_kind = self.entries[k]
+            blobs[k] = bytes(memoryview(self.mm)[o:o + w * h * 4])
+            meta[k] = (w, h, ck, image_kind)
+        for key, image in self.pending.items():
+            blobs[key] = pygame.image.tobytes(image, PIXELS)
+            ck = image.get_colorkey()
+            meta[key] = (*image.get_size(), list(ck) if ck is not None else None, kind(image))
+
+        # Offsets depend on the index length, which depends on the offsets, so
+        # reserve room for the index first and pad it out
+        def layout(start):
+            index, offset = {}, start
+            for k in keys:
+                w, h, ck, image_kind = meta[k]
+                index[k] = [offset, w, h, ck, image_kind]
+                offset = align(offset + len(blobs[k]))
+            return index
+        index = layout(0)
+        blob = json.dumps(index, separators=(",", ":")).encode()
+        start = align(HEADER.size + len(blob) + 16 * len(keys) + 64)
+        index = layout(start)
+        blob = json.dumps(index, separators=(",", ":")).encode()
+        assert HEADER.size + len(blob) <= start, "sprite cache index outgrew its reserved room"
+        blob += b" " * (start - HEADER.size - len(blob))
+
+        w, h = self.sheet_size
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, st.st_mtime_ns, st.st_size, source_hash(self.path), w, h, len(blob)))
+            f.write(blob)
+            for k in keys:
+                f.write(b"\0" * (index[k][0] - f.tell()))
+                f.write(blobs[k])
+        os.replace(tmp, self.cache_path)
+        self.pending.clear()
+        self._read()
+
+class DiskCache:
+    def __init__(self, manifest=MANIFEST):
+        self.sheets = {}   # normalised source path -> SheetCache
+        self.manifest_path = manifest
+        self.manifest = None
+        self.seen = {}     # normalised source path -> keys asked for since the last flush
+        self.native_masks = None
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+
+    def _sheet(self, path):
+        norm = os.path.normpath(path)
+        cache = self.sheets.get(norm)
+        if cache is None:
+            cache = self.sheets[norm] = SheetCache(path)
+        return cache
+
+    def has(self, path, params):
+        return params_key(params) in self._sheet(path)
+
+    def _manifest(self):
+        if self.manifest is None:
+            try:
+                with open(self.manifest_path) as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                self.manifest = {}
+        return self.manifest
+
+    def complete(self, path, mode):
+        """True if every image path gave mode last time is still on disk."""
+        keys = self._manifest().get(mode, {}).get(os.path.normpath(path))
+        cache = self._sheet(path)
+        return keys is not None and all(k in cache for k in keys)
+
+    def sheet_size(self, path):
+        return self._sheet(path).sheet_size
+
+    def get(self, path, params):
+        if self.native_masks is None:
+            self.native_masks = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+        key = params_key(params)
+        self.seen.setdefault(os.path.normpath(path), set()).add(key)
+        image = self._sheet(path).get(key, self.native_masks)
+        if image is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return image
+
+    def put(self, path, params, image, sheet_size):
+        cache = self._sheet(path)
+        cache.sheet_size = sheet_size
+        cache.pending[params_key(params)] = image
+        self.seen.setdefault(os.path.normpath(path), set()).add(params_key(params))
+
+    def flush(self, mode=None):
+        """Write out the sources that got new images, returns how many files.
+
+        With a mode, what got asked for since the last flush is saved as
+        everything that mode needs, see complete().
+        """
+        count = 0
+        for cache in self.sheets.values():
+            if cache.pending:
+                try:
+                    cache.write()
+                    count += 1
+                except OSError as e:
+                    print(f"Warning: could not write {cache.cache_path}: {e}")
+        self.written += count
+        if mode is not None and self.seen:
+            self._manifest()[mode] = {path: sorted(keys) for path, keys in self.seen.items()}
+            try:
+                tmp = self.manifest_path + ".tmp"
+                with open(tmp, 'w') as f:
+                    json.dump(self.manifest, f, separators=(",", ":"))
+                os.replace(tmp, self.manifest_path)
+            except OSError as e:
+                print(f"Warning: could not write {self.manifest_path}: {e}")
+        self.seen = {}
+        return count
+
+    def stats(self):
+        return {
+            "sources": len(self.sheets),
+            "images": sum(len(c.entries) for c in self.sheets.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "files_written": self.written,
+        }
+
+def clear(directory="."):
+    removed = 0
+    for name in os.listdir(directory):
+        if name.endswith(SUFFIX) or name == MANIFEST:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the pre-scaled sprite caches for both render modes")
+    parser.add_argument("--size", default="1920x1080", help="screen size the game runs at")
+    parser.add_argument("--clear", action="store_true", help="delete the caches instead")
+    args = parser.parse_args(argv)
+    if args.clear:
+        print(f"removed {clear()} cache files")
+        return 0
+
+    from assets import ASSETS
+    from Purple_core_main import Game
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode(tuple(int(v) for v in args.size.lower().split("x")))
+    for low_res in (False, True):
+        Game(screen, low_res=low_res).unload()
+    print(f"asset cache: {ASSETS.disk.stats()}")
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
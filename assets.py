@@ -0,0 +1,342 @@
+"""Decoded sheets and the images cut out of them, loaded once and shared.
+
+    sheet = ASSETS.sheet("Forest_moving_platform.png")         # refs +1
+    frame = ASSETS.image("Forest_moving_platform.png", (0, 0, 32, 16), scale=4)
+    ...
+    ASSETS.release(frame)                                        # refs -1, unloaded at 0
+
+Everything is keyed by what it is (path, source rect, scale, colorkey,
+rotation, flip), so ten platforms on the same sheet decode it once and share
+one set of frames. The surfaces handed out are shared, don't draw on them.
+Images come out in whichever format blits fastest for their pixels, see
+optimize().
+
+A stage takes a scope(), builds its SpriteSheets with it and calls
+release_all() when it's done, whatever nobody else holds gets unloaded.
+Give the manager an asset_cache.DiskCache and processed images are kept
+on disk between runs as well. preload() decodes a stage's sheets on a
+thread pool before it starts cutting from them.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pygame
+
+def decode(path):
+    """The file decoded as is. Doesn't touch the display, so it's fine on a
+    worker thread, and pygame lets go of the GIL while it decodes."""
+    try:
+        return pygame.image.load(path)
+    except pygame.error as e:
+        print(f"Unable to load spritesheet image: {path}")
+        raise SystemExit(e)
+
+def finish_sheet(surface, colorkey=None):
+    """The display-dependent half of loading, main thread only."""
+    # Use convert_alpha() to support modern PNG transparency
+    sheet = surface.convert_alpha()
+    if colorkey is not None:
+        sheet.set_colorkey(colorkey)
+    return sheet
+
+def load_sheet(path, colorkey=None):
+    return finish_sheet(decode(path), colorkey)
+
+def cut_image(sheet, rect=None, scale=1, colorkey=None, rotation=0, flip=False, size=None):
+    """One image out of a sheet (all of it when rect is None), scaled or
+    stretched to size, then rotated, then mirrored left to right."""
+    if rect is None:
+        image = sheet.copy()
+        width, height = image.get_size()
+    else:
+        x, y, width, height = rect
+        # Create a surface that supports transparency (SRCALPHA)
+        image = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
+        image.blit(sheet, (0, 0), (x, y, width, height))
+    if colorkey:
+        image.set_colorkey(colorkey)
+    if size is not None:
+        image = pygame.transform.scale(image, size)
+    elif scale != 1:
+        # 'scale' rather than 'smoothscale' keeps pixel art crisp
+        image = pygame.transform.scale(image, (int(width * scale), int(height * scale)))
+    if rotation != 0:
+        image = pygame.transform.rotate(image, rotation)
+    if flip:
+        image = pygame.transform.flip(image, True, False)
+    return image
+
+# Colorkeys tried, in order, for images that need one and don't bring their own
+KEY_COLORS = ((255, 0, 255), (0, 255, 255), (1, 2, 3))
+
+def optimize(image):
+    """image in the display format that blits fastest for what's in it.
+
+    Fully opaque images get a plain convert(), no alpha to blend. If every
+    pixel is either fully there or fully not it's convert() with a RLE
+    colorkey, runs of key get skipped whole. Only real translucency pays
+    for convert_alpha(). Pixels matching the image's colorkey count as not
+    there.
+    """
+    probe = image.copy()
+    probe.set_colorkey(None)   # masks go by the colorkey instead of alpha otherwise
+    colorkey = image.get_colorkey()
+    if colorkey is None and _opaque(probe):
+        return image.convert()   # big backgrounds, a lot quicker than the masks below
+
+    solid = pygame.mask.from_surface(probe, 254)
+    visible = pygame.mask.from_surface(probe, 0)
+    if colorkey is not None:
+        keyed = pygame.mask.from_threshold(probe, colorkey, (1, 1, 1, 255))
+        solid.erase(keyed, (0, 0))
+        visible.erase(keyed, (0, 0))
+
+    count = solid.count()
+    if count == visible.count():
+        if count == image.get_width() * image.get_height():
+            image = image.convert()
+            image.set_colorkey(None)   # nothing matches it, a keyed blit would only check every pixel
+            return image
+        key = colorkey
+        if key is None:
+            key = next((c for c in KEY_COLORS
+                        if not pygame.mask.from_threshold(probe, c, (1, 1, 1, 255)).overlap_area(solid, (0, 0))), None)
+        if key is not None:
+            flat = pygame.Surface(image.get_size()).convert()
+            flat.fill(key)
+            flat.blit(probe, (0, 0))   # opaque pixels copy over, the rest leave the key showing
+            flat.set_colorkey(key, pygame.RLEACCEL)
+            return flat
+
+    image = image.convert_alpha()
+    image.set_colorkey(colorkey)
+    return image
+
+def _opaque(image):
+    # Anything short of full alpha comes out different over black than over white
+    over = []
+    backdrop = pygame.Surface(image.get_size(), 0, 32)
+    for fill in ((0, 0, 0), (255, 255, 255)):
+        backdrop.fill(fill)
+        backdrop.blit(image, (0, 0))
+        over.append(pygame.image.tobytes(backdrop, "RGBX"))
+    return over[0] == over[1]
+
+def kind(image):
+    """What optimize() made of image: "opaque", "colorkey" or "alpha"."""
+    if image.get_flags() & pygame.SRCALPHA:
+        return "alpha"
+    return "opaque" if image.get_colorkey() is None else "colorkey"
+
+def _color(c):
+    return None if c is None else tuple(c)
+
+def _sheet_key(path, colorkey):
+    return ("sheet", os.path.normpath(path), _color(colorkey))
+
+def _params(rect, scale, colorkey, rotation, sheet_colorkey, flip, size, optimized):
+    return (None if rect is None else tuple(rect), scale, _color(colorkey), rotation,
+            _color(sheet_colorkey), bool(flip), None if size is None else tuple(size), optimized)
+
+class AssetManager:
+    def __init__(self, disk=None, optimize=True):
+        # An asset_cache.DiskCache to keep processed images in between runs
+        self.disk = disk
+        # False hands images out as cut, SRCALPHA whatever's in them
+        self.optimize = optimize
+        self.entries = {}   # key -> [surface, refs]
+        self.keys = {}      # id(surface) -> key, so release() can take the surface
+        self.hits = 0
+        self.misses = 0
+        self.unloads = 0
+
+    def _acquire(self, key, build):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            surface = build()
+            entry = self.entries[key] = [surface, 0]
+            self.keys[id(surface)] = key
+        else:
+            self.hits += 1
+        entry[1] += 1
+        return entry[0]
+
+    def sheet(self, path, colorkey=None):
+        """The whole decoded sheet."""
+        return self._acquire(_sheet_key(path, colorkey), lambda: load_sheet(path, colorkey))
+
+    def image(self, path, rect=None, scale=1, colorkey=None, rotation=0, sheet_colorkey=None, flip=False, size=None):
+        """rect (x, y, w, h) of the sheet at path, processed like cut_image().
+
+        With a disk cache nothing gets decoded if the image was cut on an
+        earlier run. Otherwise the sheet is only loaded for the cut if it
+        isn't resident already, hold it (or a SpriteSheet) while cutting a
+        lot of images from it.
+        """
+        params = _params(rect, scale, colorkey, rotation, sheet_colorkey, flip, size, self.optimize)
+        key = ("image", os.path.normpath(path)) + params
+        def build():
+            if self.disk is not None:
+                image = self.disk.get(path, params)
+                if image is not None:
+                    return image
+            resident = self.entries.get(_sheet_key(path, sheet_colorkey))
+            sheet = resident[0] if resident is not None else self.sheet(path, sheet_colorkey)
+            try:
+                image = cut_image(sheet, rect, scale, colorkey, rotation, flip, size)
+                if self.optimize:
+                    image = optimize(image)
+                if self.disk is not None:
+                    self.disk.put(path, params, image, sheet.get_size())
+                return image
+            finally:
+                if resident is None:
+                    self.release(sheet)
+        return self._acquire(key, build)
+
+    def preload(self, sheets, workers=4, progress=None, mode=None):
+        """Decode sheets on a pool of worker threads, then convert them all
+        here on the calling thread. Returns them, acquired like sheet().
+
+        sheets are paths or (path, colorkey). With a mode, sources the disk
+        cache has every image of that mode from are left alone, their images
+        don't need the sheet (see DiskCache.complete()). progress(done, total,
+        path) gets called on this thread as each file finishes decoding.
+        """
+        wanted, paths = [], []
+        for item in sheets:
+            path, colorkey = (item, None) if isinstance(item, str) else item
+            if self.disk is not None and mode is not None and self.disk.complete(path, mode):
+                continue
+            wanted.append((path, colorkey))
+            if _sheet_key(path, colorkey) not in self.entries and path not in paths:
+                paths.append(path)
+
+        decoded = {}
+        def done(path):
+            if progress is not None:
+                progress(len(decoded), len(paths), path)
+        if workers > 1 and len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(decode, path): path for path in paths}
+                for future in as_completed(futures):
+                    decoded[futures[future]] = future.result()
+                    done(futures[future])
+        else:
+            for path in paths:
+                decoded[path] = decode(path)
+                done(path)
+
+        # One convert pass, the display's pixel format is only safe to use from here
+        return [self._acquire(_sheet_key(path, colorkey), lambda: finish_sheet(decoded[path], colorkey))
+                for path, colorkey in wanted]
+
+    def cached(self, path, rect=None, scale=1, colorkey=None, rotation=0, sheet_colorkey=None, flip=False, size=None):
+        """True if image() would get by without the sheet."""
+        params = _params(rect, scale, colorkey, rotation, sheet_colorkey, flip, size, self.optimize)
+        if ("image", os.path.normpath(path)) + params in self.entries:
+            return True
+        return self.disk is not None and self.disk.has(path, params)
+
+    def sheet_size(self, path, colorkey=None):
+        """(width, height) of the source, without decoding it if that can be helped."""
+        resident = self.entries.get(_sheet_key(path, colorkey))
+        if resident is not None:
+            return resident[0].get_size()
+        if self.disk is not None:
+            size = self.disk.sheet_size(path)
+            if size is not None:
+                return size
+        sheet = self.sheet(path, colorkey)
+        self.release(sheet)
+        return sheet.get_size()
+
+    def release(self, surface):
+        key = self.keys[id(surface)]
+        entry = self.entries[key]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.entries[key]
+            del self.keys[id(surface)]
+            self.unloads += 1
+
+    def refs(self, surface):
+        key = self.keys.get(id(surface))
+        return self.entries[key][1] if key is not None else 0
+
+    def scope(self):
+        return AssetScope(self)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def resident_bytes(self):
+        return sum(s.get_pitch() * s.get_height() for s, _ in self.entries.values())
+
+    def stats(self):
+        sheets = sum(1 for key in self.entries if key[0] == "sheet")
+        kinds = {}
+        for key, (surface, _) in self.entries.items():
+            if key[0] == "image":
+                k = kind(surface)
+                kinds[k] = kinds.get(k, 0) + 1
+        return {
+            "sheets": sheets,
+            "images": len(self.entries) - sheets,
+            "kinds": kinds,
+            "resident_bytes": self.resident_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "unloads": self.unloads,
+        }
+
+class AssetScope:
+    """Acquires through an AssetManager and remembers what, for release_all()."""
+    def __init__(self, manager):
+        self.manager = manager
+        self.held = {}   # surface -> times acquired, so release() doesn't scan
+
+    def sheet(self, path, colorkey=None):
+        surface = self.manager.sheet(path, colorkey)
+        self._hold(surface)
+        return surface
+
+    def image(self, path, rect=None, scale=1, colorkey=None, rotation=0, sheet_colorkey=None, flip=False, size=None):
+        surface = self.manager.image(path, rect, scale, colorkey, rotation, sheet_colorkey, flip, size)
+        self._hold(surface)
+        return surface
+
+    def preload(self, sheets, workers=4, progress=None, mode=None):
+        surfaces = self.manager.preload(sheets, workers, progress, mode)
+        for surface in surfaces:
+            self._hold(surface)
+        return surfaces
+
+    def _hold(self, surface):
+        self.held[surface] = self.held.get(surface, 0) + 1
+
+    # Lookups that don't acquire anything
+    def cached(self, *args, **kwargs):
+        return self.manager.cached(*args, **kwargs)
+
+    def sheet_size(self, path, colorkey=None):
+        return self.manager.sheet_size(path, colorkey)
+
+    def release(self, surface):
+        if self.held[surface] > 1:
+            self.held[surface] -= 1
+        else:
+            del self.held[surface]
+        self.manager.release(surface)
+
+    def release_all(self):
+        for surface, count in reversed(self.held.items()):
+            for _ in range(count):
+                self.manager.release(surface)
+        self.held.clear()
+
+    def __len__(self):
+        return sum(self.held.values())
+
+# The one everything shares unless handed something else
+ASSETS = AssetManager()
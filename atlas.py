@@ -0,0 +1,170 @@
+"""Packs lots of small images into a few big surfaces (pages).
+
+    builder = AtlasBuilder()
+    frame = builder.add(image)      # an AtlasSprite, usable straight away
+    ...
+    builder.build()                 # now every sprite points into a page
+    screen.blits([(frame.surface, pos, frame.rect), ...])
+
+A page only holds images of one format, the way assets.optimize() left
+them: keyed images share pages by colorkey, opaque ones share theirs,
+translucent ones go on SRCALPHA pages, keyed by colorkey too if they have
+one. Pixels are copied unchanged.
+
+Keyed pages are not RLE'd: SDL's software RLE blitter walks a page's runs
+from the top left for every area rect, which made blitting out of an RLE
+page about 10x slower than out of a plain keyed one (benchmarks/bench_atlas).
+"""
+import pygame
+
+class AtlasSprite:
+    """An image as (surface, rect), blit it with blit(s.surface, pos, s.rect)."""
+    __slots__ = ("surface", "rect")
+
+    def __init__(self, surface, rect=None):
+        self.surface = surface
+        self.rect = surface.get_rect() if rect is None else pygame.Rect(rect)
+
+    def get_width(self):
+        return self.rect.width
+
+    def get_height(self):
+        return self.rect.height
+
+    def get_size(self):
+        return self.rect.size
+
+    def image(self):
+        """A Surface of its own, for anything that wants to change it."""
+        image = self.surface.subsurface(self.rect).copy()
+        colorkey = self.surface.get_colorkey()
+        if colorkey is not None:
+            # A Surface of its own can be RLE'd again, like assets.optimize() leaves keyed images
+            image.set_colorkey(colorkey, 0 if image.get_flags() & pygame.SRCALPHA else pygame.RLEACCEL)
+        return image
+
+def sprite(image, atlas=None):
+    """image as an AtlasSprite, filed with atlas if there is one."""
+    return AtlasSprite(image) if atlas is None else atlas.add(image)
+
+class ShelfPacker:
+    """Fills rows ("shelves") left to right, each as tall as the first thing
+    put on it, and opens a new one below when nothing fits. Feed it tallest
+    first and not much goes to waste."""
+    def __init__(self, width, height, padding=1):
+        self.width = width
+        self.height = height
+        self.padding = padding
+        self.shelves = []   # [y, height, next free x]
+        self.used_width = 0
+        self.used_height = 0
+
+    def insert(self, w, h):
+        """Top left corner for a w x h rect, None if the page is full."""
+        best = None
+        for shelf in self.shelves:
+            if h <= shelf[1] and shelf[2] + w <= self.width and (best is None or shelf[1] < best[1]):
+                best = shelf   # the lowest shelf it fits on wastes the least
+        if best is None:
+            if w > self.width or self.used_height + h > self.height:
+                return None
+            best = [self.used_height, h, 0]
+            self.shelves.append(best)
+            self.used_height += h + self.padding
+        x, y = best[2], best[0]
+        best[2] += w + self.padding
+        self.used_width = max(self.used_width, x + w)
+        return x, y
+
+def page_format(image):
+    """The kind of page image can go on unchanged."""
+    colorkey = image.get_colorkey()
+    if image.get_flags() & pygame.SRCALPHA:
+        return ("alpha", colorkey)   # optimize() can leave a key on these as well
+    return ("opaque",) if colorkey is None else ("colorkey", colorkey)
+
+class AtlasBuilder:
+    def __init__(self, page_size=1024, padding=1):
+        self.page_size = page_size
+        self.padding = padding
+        self.sprites = []
+        self.pending = {}    # id(source image) -> AtlasSprite, added since the last build
+        self.sources = []    # one per add(), what build() hands back (and keeps those ids taken)
+        self.pages = []
+
+    def add(self, image):
+        """The AtlasSprite for image, the same one every time it's added before a build()."""
+        self.sources.append(image)
+        atlas_sprite = self.pending.get(id(image))
+        if atlas_sprite is None:
+            atlas_sprite = self.pending[id(image)] = AtlasSprite(image)
+            self.sprites.append(atlas_sprite)
+        return atlas_sprite
+
+    def build(self):
+        """Pack everything added since the last build into new pages.
+
+        Returns the images they were added with, once per add(), so the
+        caller can release them. Anything bigger than a page stays as it is.
+        """
+        groups = {}
+        for atlas_sprite in self.pending.values():
+            groups.setdefault(page_format(atlas_sprite.surface), []).append(atlas_sprite)
+        for fmt, sprites in groups.items():
+            sprites.sort(key=lambda s: (s.rect.height, s.rect.width), reverse=True)
+            packed = []   # (packer, [(sprite, (x, y))])
+            for atlas_sprite in sprites:
+                w, h = atlas_sprite.rect.size
+                for packer, placed in packed:
+                    pos = packer.insert(w, h)
+                    if pos is not None:
+                        break
+                else:
+                    packer, placed = ShelfPacker(self.page_size, self.page_size, self.padding), []
+                    pos = packer.insert(w, h)
+                    if pos is None:
+                        continue
+                    packed.append((packer, placed))
+                placed.append((atlas_sprite, pos))
+            for packer, placed in packed:
+                self.pages.append(self.page(fmt, (packer.used_width, packer.used_height), placed))
+
+        sources = self.sources
+        self.pending, self.sources = {}, []
+        return sources
+
+    def page(self, fmt, size, placed):
+        if fmt[0] == "alpha":
+            page = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            page.fill((0, 0, 0, 0))
+        else:
+            page = pygame.Surface(size).convert()
+            if fmt[0] == "colorkey":
+                page.fill(fmt[1])
+        for atlas_sprite, pos in placed:
+            source = atlas_sprite.surface
+            if fmt[0] == "alpha":
+                # Blending onto the empty page would change translucent pixels and the
+                # key would leave its pixels out, copy them as they are, the page gets the key
+                source = source.copy()
+                source.set_alpha(None)
+                source.set_colorkey(None)
+            page.blit(source, pos, atlas_sprite.rect)
+            atlas_sprite.surface = page
+            atlas_sprite.rect = pygame.Rect(pos, atlas_sprite.rect.size)
+        if fmt[1:] and fmt[1] is not None:
+            page.set_colorkey(fmt[1])   # no RLEACCEL, see the module docstring
+        return page
+
+    def resident_bytes(self):
+        return sum(page.get_pitch() * page.get_height() for page in self.pages)
+
+    def stats(self):
+        used = sum(s.rect.width * s.rect.height for s in self.sprites if s.surface in self.pages)
+        area = sum(page.get_width() * page.get_height() for page in self.pages)
+        return {
+            "pages": len(self.pages),
+            "sprites": len(self.sprites),
+            "resident_bytes": self.resident_bytes(),
+            "fill": round(used / area, 3) if area else 0,
+        }
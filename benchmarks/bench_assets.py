@@ -0,0 +1,58 @@
+"""What sharing sheets through the AssetManager saves when a stage builds
+lots of sprites from the same files.
+
+    SDL_VIDEODRIVER=dummy python -m benchmarks.bench_assets [platforms]
+
+Builds the moving platforms and the player once each with their own private
+manager (every one decodes and scales its own copy, like before) and once
+through a shared stage scope, then releases the scope to check everything
+gets unloaded.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from assets import AssetManager
+from moving_platform import MovingPlatform
+from Player import Player
+
+TS = 16 * 4
+
+def build(count, assets_for):
+    start = time.perf_counter()
+    sprites = [MovingPlatform("Forest_moving_platform.png", (i * TS, 0), (i * TS + 5 * TS, 0), 4, 32, 16, 4, 1,
+                              assets=assets_for()) for i in range(count)]
+    sprites += [Player(0, 0, "Purple_core_player.png", (0, 255, 0), 2, 48, assets=assets_for()) for _ in range(2)]
+    return sprites, time.perf_counter() - start
+
+def run(count=10):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    private = []
+    def own():
+        private.append(AssetManager())
+        return private[-1]
+    _, alone = build(count, own)
+    alone_bytes = sum(m.resident_bytes() for m in private)
+
+    shared = AssetManager()
+    scope = shared.scope()
+    _, together = build(count, lambda: scope)
+    stats = shared.stats()
+
+    print(f"{count} platforms + 2 players")
+    print(f"  private managers  {alone * 1000:7.1f} ms   {alone_bytes / 1024:8.0f} KB resident   "
+          f"{sum(m.misses for m in private)} decodes/cuts")
+    print(f"  one shared scope  {together * 1000:7.1f} ms   {stats['resident_bytes'] / 1024:8.0f} KB resident   "
+          f"{stats['misses']} decodes/cuts, {stats['hits']} hits")
+    scope.release_all()
+    print(f"  after release_all: {shared.stats()}")
+    pygame.quit()
+    return len(shared) == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if run(*(int(a) for a in sys.argv[1:2])) else 1)
@@ -0,0 +1,100 @@
+"""Separate frame Surfaces against the same frames packed into atlas pages.
+
+    SDL_VIDEODRIVER=dummy python -m benchmarks.bench_atlas [platforms]
+
+Builds the player, the hearts and a crowd of moving platforms both ways,
+then draws a busy frame (every platform, the player, its ghosts and the
+hearts) one blit per sprite from separate Surfaces, and as one blits()
+per kind from the atlas pages. Checks both draw the same pixels.
+
+Pages aren't RLE'd (area blits out of an RLE page are far slower), and
+that leaves keyed sprites drawing faster from their own RLE'd Surfaces,
+see PACK_SPRITES.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from assets import AssetManager
+from atlas import AtlasBuilder
+from moving_platform import MovingPlatform
+from Player import Player
+from UI import GameUI
+
+TS = 16 * 4
+SIZE = (1920, 1080)
+REPEATS = 200
+
+def build(count, atlas):
+    assets = AssetManager()
+    scope = assets.scope()
+    player = Player(0, 0, "Purple_core_player.png", (0, 255, 0), 2, 48, assets=scope, atlas=atlas)
+    ui = GameUI(player, "UI_stuff.png", assets=scope, atlas=atlas)
+    platforms = [MovingPlatform("Forest_moving_platform.png", (0, 0), (5 * TS, 0), 4, 32, 16, 4, 1,
+                                assets=scope, atlas=atlas) for _ in range(count)]
+    if atlas is not None:
+        for image in atlas.build():
+            scope.release(image)
+    return assets, player, ui, platforms
+
+def scene(player, platforms, seed=7):
+    """(sprite, pos) for a busy frame: every platform, and the player's frames standing in for ghosts."""
+    rng = random.Random(seed)
+    frames = [f for strip in player.animations.values() for f in strip]
+    frames += [player.mirrored[f] for f in frames]
+    placed = [(p.image, (rng.randrange(SIZE[0]), rng.randrange(SIZE[1]))) for p in platforms]
+    placed += [(rng.choice(frames), (rng.randrange(SIZE[0]), rng.randrange(SIZE[1]))) for _ in range(17)]
+    return placed
+
+def run(count=200):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    target = pygame.Surface(SIZE).convert()
+
+    loose_assets, loose_player, loose_ui, loose_platforms = build(count, None)
+    atlas = AtlasBuilder()
+    atlas_assets, atlas_player, atlas_ui, atlas_platforms = build(count, atlas)
+
+    loose = [(s.surface, pos) for s, pos in scene(loose_player, loose_platforms)]
+    packed = [(s.surface, pos, s.rect) for s, pos in scene(atlas_player, atlas_platforms)]
+
+    def one_by_one():
+        for surface, pos in loose:
+            target.blit(surface, pos)
+        loose_ui.draw(target)
+    def batched():
+        target.blits(packed, doreturn=False)
+        atlas_ui.draw(target)
+
+    timings = {}
+    for name, draw in (("separate", one_by_one), ("atlas", batched)):
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                draw()
+            best = min(best, (time.perf_counter() - start) / REPEATS)
+        target.fill((0, 0, 0))
+        draw()
+        timings[name] = (best, pygame.image.tobytes(target, "RGB"))
+
+    images = [s for key, (s, _) in loose_assets.entries.items() if key[0] == "image"]
+    print(f"{count} platforms, player, hearts: {len(loose) + loose_player.max_hearts} sprites a frame")
+    print(f"  separate  {timings['separate'][0] * 1e6:7.1f} us/frame   "
+          f"{len(images)} surfaces, {sum(s.get_pitch() * s.get_height() for s in images) / 1024:6.0f} KB")
+    stats = atlas.stats()
+    left = atlas_assets.stats()
+    print(f"  atlas     {timings['atlas'][0] * 1e6:7.1f} us/frame   "
+          f"{stats['pages']} pages ({stats['fill']:.0%} full), {stats['resident_bytes'] / 1024:6.0f} KB, "
+          f"{left['images']} images left in the manager")
+    same = timings["separate"][1] == timings["atlas"][1]
+    print(f"  same pixels: {same}")
+    pygame.quit()
+    return same
+
+if __name__ == "__main__":
+    sys.exit(0 if run(*(int(a) for a in sys.argv[1:2])) else 1)
@@ -0,0 +1,185 @@
+"""Compare the Player collision queries on the flag grid, with and without the
+merged solid rects, against the old dict path. Also checks the merged-rect
+range queries against a plain cell scan on random ranges.
+
+    SDL_VIDEODRIVER=dummy python -m benchmarks.bench_collision
+
+Exits non-zero if anything mismatches.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from mapdraw import Mapdraw
+from collision import CollisionGrid, SOLID, BRIDGE
+from Player import Player
+from geometry import Rect
+from tile_grid import EMPTY
+
+class DictPathPlayer(Player):
+    """The collision queries as they were before CollisionGrid, kept for comparison."""
+
+    def check_collisions(self, grid, tile_size, properties, axis):
+        start_col, end_col = self.hitbox.left // tile_size, self.hitbox.right // tile_size
+        start_row, end_row = self.hitbox.top // tile_size, self.hitbox.bottom // tile_size
+        for r in range(int(start_row), int(end_row) + 1):
+            for c in range(int(start_col), int(end_col) + 1):
+                if not (0 <= r < len(grid) and 0 <= c < len(grid[0])): continue
+                tid = grid[r][c]
+                if tid == EMPTY: continue
+                props = properties.get(int(tid), {})
+                tile_rect = pygame.Rect(c * tile_size, r * tile_size, tile_size, tile_size)
+                if not self.hitbox.colliderect(tile_rect): continue
+                if axis == 'x' and props.get("solid"):
+                    if self.vel_x > 0: self.hitbox.right = tile_rect.left
+                    else: self.hitbox.left = tile_rect.right
+                    self.vel_x, self.pos_x = 0, float(self.hitbox.x)
+                elif axis == 'y':
+                    if props.get("solid"):
+                        if self.vel_y > 0:
+                            self.hitbox.bottom = tile_rect.top
+                            self.on_ground = True
+                            self.on_solid_ground = True
+                        else:
+                            self.hitbox.top = tile_rect.bottom
+                        self.vel_y, self.pos_y = 0, float(self.hitbox.y)
+                    elif props.get("type") == "bridge" and self.vel_y > 0 and not pygame.key.get_pressed()[pygame.K_s]:
+                        if (self.hitbox.bottom - self.vel_y) <= tile_rect.top + 10:
+                            self.hitbox.bottom = tile_rect.top
+                            self.on_ground = True
+                            self.jumps_left = 2
+                            self.coyote_timer = self.current_time
+                            self.vel_y, self.pos_y = 0, float(self.hitbox.y)
+
+    def is_ceiling_above(self, grid, tile_size, properties):
+        check_rect = pygame.Rect(self.hitbox.x, self.hitbox.bottom - self.height_standing,
+                                 self.width_standing, self.height_standing - self.height_sliding - 2)
+        for r in range(int(check_rect.top // tile_size), int(check_rect.bottom // tile_size) + 1):
+            for c in range(int(check_rect.left // tile_size), int(check_rect.right // tile_size) + 1):
+                if 0 <= r < len(grid) and 0 <= c < len(grid[0]):
+                    tid = grid[r][c]
+                    if tid != EMPTY and properties.get(int(tid), {}).get("solid"): return True
+        return False
+
+    def check_liquid(self, grid, tile_size, properties):
+        self.in_water = False
+        cx, cy = self.hitbox.centerx // tile_size, self.hitbox.centery // tile_size
+        if 0 <= cy < len(grid) and 0 <= cx < len(grid[0]):
+            tid = grid[cy][cx]
+            if tid != EMPTY and properties.get(int(tid), {}).get("type") == "liquid": self.in_water = True
+
+    def check_hazards(self, grid, tile_size, properties):
+        for pt in [self.hitbox.center, self.hitbox.midbottom]:
+            cx, cy = int(pt[0] // tile_size), int(pt[1] // tile_size)
+            if 0 <= cy < len(grid) and 0 <= cx < len(grid[0]):
+                tid = grid[cy][cx]
+                if tid != EMPTY and properties.get(int(tid), {}).get("damage", 0) > 0:
+                    self.take_damage(properties[int(tid)]["damage"], (cx * tile_size) + (tile_size // 2))
+                    break
+
+def make_samples(count, map_w, map_h, seed=1):
+    rng = random.Random(seed)
+    return [(rng.randrange(-64, map_w), rng.randrange(-64, map_h),
+             rng.uniform(-30, 30), rng.uniform(-20, 20), rng.random() < 0.3)
+            for _ in range(count)]
+
+def edge_samples(count, map_w, map_h, ts, seed=3):
+    # Hitboxes sitting exactly on, or one pixel off, tile boundaries
+    rng = random.Random(seed)
+    return [(rng.randrange(0, map_w // ts) * ts + rng.choice((-49, -48, -33, -32, -1, 0, 1)),
+             rng.randrange(0, map_h // ts) * ts + rng.choice((-81, -80, -37, -36, -1, 0, 1)),
+             rng.choice((-20, -1, 0, 0.5, 1, 20)), rng.choice((-15, -0.8, 0, 0.8, 1, 15)), rng.random() < 0.3)
+            for _ in range(count)]
+
+def check_range_queries(merged, cells, count=50000, seed=4):
+    """any_in_cells / overlaps through the rect index vs the per-cell fallback."""
+    rng = random.Random(seed)
+    ts = merged.tile_size
+    mismatches = 0
+    for _ in range(count):
+        c0, r0 = rng.randrange(-3, merged.cols + 3), rng.randrange(-3, merged.rows + 3)
+        c1, r1 = c0 + rng.randrange(-1, 6), r0 + rng.randrange(-1, 6)
+        x, y = rng.randrange(-100, merged.width_px + 100), rng.randrange(-100, merged.height_px + 100)
+        rect = Rect(x, y, rng.randrange(0, 200), rng.randrange(0, 200))
+        for mask in CollisionGrid.MERGED:
+            if merged.any_in_cells(c0, r0, c1, r1, mask) != cells.any_in_cells(c0, r0, c1, r1, mask):
+                mismatches += 1
+            if merged.overlaps(rect, mask) != cells.overlaps(rect, mask):
+                mismatches += 1
+    return mismatches
+
+def place(player, sample):
+    x, y, vx, vy, sliding = sample
+    w, h = (player.width_sliding, player.height_sliding) if sliding else (player.width_standing, player.height_standing)
+    player.hitbox.update(x, y, w, h)
+    player.pos_x, player.pos_y = float(x), float(y)
+    player.vel_x, player.vel_y = vx, vy
+    player.invincible = True  # keep take_damage from knocking the sample around
+
+def tick_queries(player, args):
+    # What one Player.update tick asks of the map
+    player.check_liquid(*args)
+    player.check_hazards(*args)
+    player.is_ceiling_above(*args)
+    player.check_collisions(*args, 'x')
+    player.check_collisions(*args, 'y')
+
+def state(player):
+    return (tuple(player.hitbox), player.vel_x, player.vel_y, player.on_ground, player.in_water,
+            player.is_ceiling_above(*player._args))
+
+def run(samples=20000):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    forest = Mapdraw("Forest_stage.png", "Forest_map.csv", (255, 255, 255), 16, 4)
+    props = forest.tile_properties()
+    collision = forest.compile_collision(props)
+    per_tile = CollisionGrid(forest.grid, props, forest.tile_size, merge_rects=False)
+    map_w, map_h = forest.map_size()
+    solid = collision.rect_index[SOLID | BRIDGE]
+    print(f"{sum(1 for f in collision.flags if f & (SOLID | BRIDGE))} solid/bridge cells merged into {len(solid)} rects")
+    failed = check_range_queries(collision, per_tile)
+    print(f"range queries: {failed} mismatching")
+
+    new = Player(0, 0, "Purple_core_player.png", (0, 255, 0), 2, 48)
+    tiles = Player(0, 0, "Purple_core_player.png", (0, 255, 0), 2, 48)
+    old = DictPathPlayer(0, 0, "Purple_core_player.png", (0, 255, 0), 2, 48)
+    new._args = (collision,)
+    tiles._args = (per_tile,)
+    old._args = (forest.grid, forest.tile_size, props)
+
+    everywhere = make_samples(samples, map_w, map_h)
+    # Samples whose hitbox touches at least one tile, where the per-tile cost shows
+    ts = forest.tile_size
+    near_terrain = [p for p in make_samples(samples * 8, map_w, map_h, seed=2)
+                    if any(forest.grid[r][c] != EMPTY
+                           for r in range(max(0, p[1] // ts), min(len(forest.grid), (p[1] + 80) // ts + 1))
+                           for c in range(max(0, p[0] // ts), min(len(forest.grid[0]), (p[0] + 48) // ts + 1)))][:samples]
+
+    edges = edge_samples(samples, map_w, map_h, ts)
+
+    for label, points in (("whole map", everywhere), ("near terrain", near_terrain), ("tile edges", edges)):
+        mismatches = 0
+        for p in points:
+            place(new, p); place(tiles, p); place(old, p)
+            tick_queries(new, new._args); tick_queries(tiles, tiles._args); tick_queries(old, old._args)
+            if not state(new) == state(tiles) == state(old): mismatches += 1
+
+        failed += mismatches
+        print(f"{label} ({len(points)} samples, {mismatches} mismatching)")
+        for name, player in (("dict path", old), ("per tile", tiles), ("rects", new)):
+            start = time.perf_counter()
+            for p in points:
+                place(player, p)
+                tick_queries(player, player._args)
+            elapsed = time.perf_counter() - start
+            print(f"  {name:10s} {elapsed / len(points) * 1e6:7.2f} us/tick")
+    pygame.quit()
+    return failed == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if run() else 1)
@@ -0,0 +1,116 @@
+"""Moving platforms by the hundred: the SpatialHash against plain lists.
+
+    python -m benchmarks.bench_entities [platform count] [ticks]
+
+Scatters platforms over the Forest stage and runs the headless simulation
+twice, once with the player looking platforms up in the hash and once
+scanning the whole list, checking both end in the same state. Then times
+the camera culling query against testing every platform's rect, and checks
+a snap that carries the player onto a second platform. No pygame.
+"""
+import random
+import sys
+import time
+
+from geometry import Rect, Vec2
+from platform_body import MovingPlatformBody
+from player_body import PlayerBody
+from spatial_hash import SpatialHash
+from benchmarks.bench_headless import forest, input_stream, TILE
+
+VIEW_W, VIEW_H = 1280, 720
+
+class ListSimulation:
+    """Steps a Simulation the way it went before the hash, every platform is a candidate."""
+    def __init__(self, sim):
+        self.sim = sim
+
+    def run(self, inputs):
+        sim = self.sim
+        for snapshot in inputs:
+            now = sim.timestep.now
+            for plat in sim.platforms:
+                plat.update(now)
+            sim.player.update(sim.collision, sim.screen_h, sim.platforms, now, snapshot)
+            sim.timestep.tick()
+
+def scattered(count, seed=5):
+    rng = random.Random(seed)
+    platforms = []
+    for _ in range(count):
+        x, y = rng.randrange(2, 140) * TILE, rng.randrange(5, 32) * TILE
+        dx, dy = rng.choice(((rng.randrange(2, 10) * TILE, 0), (0, rng.randrange(2, 6) * TILE)))
+        platforms.append(MovingPlatformBody((x, y), (x + dx, y + dy), rng.choice((2, 3, 4)), (128, 64)))
+    return platforms
+
+def make(count):
+    sim = forest()
+    sim.platforms += scattered(count)
+    for plat in sim.platforms[1:]:
+        sim.entities.insert(plat)
+    return sim
+
+def snap_chain():
+    """One platform carries the player across a hash cell onto the next,
+    only a query after the first snap can see the second one."""
+    def land(through_hash):
+        a = MovingPlatformBody((100, 300), (400, 300), 40, (128, 32))
+        b = MovingPlatformBody((260, 295), (260, 295), 0, (128, 32))
+        a.velocity = Vec2(40, 0)
+        player = PlayerBody(0, 0)
+        player.warp(220, 224)
+        player.vel_y = 5
+        platforms = [a, b]
+        if through_hash:
+            platforms = SpatialHash()
+            platforms.insert(a)
+            platforms.insert(b)
+        player.check_moving_platforms(platforms)
+        return tuple(player.hitbox)
+    return land(True) == land(False)
+
+def run(count=500, ticks=3000):
+    inputs = list(input_stream(ticks))
+    hashed, listed = make(count), make(count)
+
+    start = time.perf_counter()
+    hashed.run(inputs)
+    hash_time = time.perf_counter() - start
+    start = time.perf_counter()
+    ListSimulation(listed).run(inputs)
+    list_time = time.perf_counter() - start
+
+    stats = hashed.entities.stats()
+    print(f"{len(hashed.platforms)} platforms, {ticks} ticks")
+    print(f"  spatial hash  {ticks / hash_time:8,.0f} ticks/s   "
+          f"{stats['candidates'] / max(stats['queries'], 1):.2f} candidates per query, "
+          f"{stats['moves']} refiles over {stats['cells']} cells")
+    print(f"  list scan     {ticks / list_time:8,.0f} ticks/s   {len(listed.platforms)} candidates per query")
+    print("  same end state" if hashed.state_hash() == listed.state_hash() else "  END STATES DIFFER")
+
+    # Camera culling, a view sliding across the stage
+    rng = random.Random(6)
+    views = [(rng.randrange(0, 150 * TILE - VIEW_W), rng.randrange(0, 34 * TILE - VIEW_H)) for _ in range(2000)]
+    entities = hashed.entities
+    entities.reset_counters()
+    start = time.perf_counter()
+    for x, y in views:
+        entities.query_box(x, y, x + VIEW_W, y + VIEW_H)
+    hash_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for x, y in views:
+        view = Rect(x, y, VIEW_W, VIEW_H)
+        [p for p in hashed.platforms if p.rect.colliderect(view)]
+    list_time = time.perf_counter() - start
+    print(f"\nculling a {VIEW_W}x{VIEW_H} view:")
+    print(f"  spatial hash  {hash_time / len(views) * 1e6:7.1f} us/query, "
+          f"{entities.candidates / len(views):.1f} candidates")
+    print(f"  list scan     {list_time / len(views) * 1e6:7.1f} us/query, {len(hashed.platforms)} candidates")
+
+    chained = snap_chain()
+    print(f"\nsnapping from one platform onto the next: {'same' if chained else 'DIFFERENT'} through the hash")
+    return hashed.state_hash() == listed.state_hash() and chained
+
+if __name__ == "__main__":
+    ok = run(*(int(a) for a in sys.argv[1:3]))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,86 @@
+"""Blit throughput of the Forest tile set as cut (SRCALPHA) against what
+assets.optimize() makes of it.
+
+    SDL_VIDEODRIVER=dummy python -m benchmarks.bench_formats
+
+Builds the map's tiles through one AssetManager that optimizes and one
+that doesn't, then blits every tile of a screenful one by one and draws the
+baked chunks along a camera path, at native scale and into the low-res
+target, and checks both draw the same pixels.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from assets import AssetManager, kind
+from mapdraw import Mapdraw
+from tile_grid import EMPTY
+
+TILE_SIZE, SCALE = 16, 4
+SIZE = (1920, 1080)
+REPEATS = 5
+
+def build(optimize, render_scale):
+    assets = AssetManager(optimize=optimize)
+    # Room for every chunk, the draws below should only ever blit them
+    tiles = Mapdraw("Forest_stage.png", "Forest_map.csv", (255, 255, 255), TILE_SIZE, SCALE,
+                    max_chunks=1024, render_scale=render_scale, assets=assets)
+    for chunks in tiles.layer_chunks:
+        chunks.optimize = optimize
+    return tiles
+
+def tile_blits(tiles, view_w, view_h):
+    """(image, pos) for every static tile in the view at the bottom left of the map."""
+    ts = tiles.draw_tile_size
+    grid = tiles.grid
+    rows = range(max(0, len(grid) - view_h // ts - 1), len(grid))
+    return [(tiles.tile_images[tid], (col * ts, (row - rows[0]) * ts))
+            for row in rows for col, tid in enumerate(grid[row][:view_w // ts + 1])
+            if tid != EMPTY and tid not in tiles.animations]
+
+def best(fn):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def run():
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    for label, rs in (("native", 1), ("lowres", 1 / SCALE)):
+        target = pygame.Surface((int(SIZE[0] * rs), int(SIZE[1] * rs))).convert()
+        view_w, view_h = target.get_size()
+        print(f"{label} {view_w}x{view_h}")
+        frames = {}
+        for optimize in (False, True):
+            tiles = build(optimize, rs)
+            blits = tile_blits(tiles, view_w, view_h)
+            kinds = {}
+            for image, _ in blits:
+                kinds[kind(image)] = kinds.get(kind(image), 0) + 1
+            tile_time = best(lambda: target.blits(blits, doreturn=False))
+
+            map_w, map_h = tiles.map_size()
+            path = [(int((map_w * rs - view_w) * i / 60), int((map_h * rs - view_h) * i / 60)) for i in range(60)]
+            start = time.perf_counter()
+            for x, y in path:
+                tiles.draw(target, x / rs, y / rs)   # bakes every chunk the path sees
+            bake = (time.perf_counter() - start) / sum(c.misses for c in tiles.layer_chunks)
+            map_time = best(lambda: [tiles.draw(target, x / rs, y / rs) for x, y in path])
+            target.fill((0, 0, 0))
+            tiles.draw(target, 0, (map_h * rs - view_h) / rs)
+            frames[optimize] = pygame.image.tobytes(target, "RGB")
+
+            name = "optimized" if optimize else "as cut"
+            print(f"  {name:10} {tile_time / len(blits) * 1e6:6.2f} us/tile ({len(blits)} tiles, {kinds})   "
+                  f"map.draw {map_time / len(path) * 1000:6.3f} ms/frame   {bake * 1000:5.2f} ms per chunk baked")
+        print(f"  same pixels: {frames[False] == frames[True]}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    sys.exit(run())
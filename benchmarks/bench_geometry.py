@@ -0,0 +1,104 @@
+"""geometry.Rect / Vec2 against pygame.Rect / Vector2, and the trajectory
+the simulation takes with each.
+
+    python -m benchmarks.bench_geometry [samples] [ticks]
+
+Feeds both the same random ints, halves and fractions (negative ones too)
+through the constructor, update() and every setter geometry has, and
+compares the results. Then runs the Forest stage headless on a seeded input
+stream once on geometry's classes and once with pygame's patched into the
+bodies, checking the state hash every CHECK_EVERY ticks. Exits non-zero on
+any difference.
+"""
+import random
+import sys
+import time
+
+import pygame
+
+import platform_body
+import player_body
+from benchmarks.bench_headless import forest, input_stream
+from geometry import Rect, Vec2
+
+CHECK_EVERY = 100
+SETTERS = ("left", "top", "right", "bottom", "width", "height", "centerx", "centery")
+PAIR_SETTERS = ("topleft", "size", "center", "midbottom")
+
+def value(rng, positive=False):
+    v = rng.choice((rng.randrange(-500, 500), rng.randrange(-500, 500) + 0.5, rng.uniform(-500, 500)))
+    return abs(v) if positive else v
+
+def check_rects(samples, seed=1):
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(samples):
+        args = (value(rng), value(rng), value(rng, True), value(rng, True))
+        ours, theirs = Rect(*args), pygame.Rect(*args)
+        mismatches += tuple(ours) != tuple(theirs)
+        args = (value(rng), value(rng), value(rng, True), value(rng, True))
+        ours.update(*args)
+        theirs.update(*args)
+        mismatches += tuple(ours) != tuple(theirs)
+        for name in SETTERS:
+            v = value(rng, name in ("width", "height"))
+            setattr(ours, name, v)
+            setattr(theirs, name, v)
+            mismatches += tuple(ours) != tuple(theirs) or getattr(ours, name) != getattr(theirs, name)
+        for name in PAIR_SETTERS:
+            v = (value(rng, name == "size"), value(rng, name == "size"))
+            setattr(ours, name, v)
+            setattr(theirs, name, v)
+            mismatches += tuple(ours) != tuple(theirs) or tuple(getattr(ours, name)) != tuple(getattr(theirs, name))
+        other = (rng.randrange(-500, 500), rng.randrange(-500, 500), rng.randrange(0, 300), rng.randrange(0, 300))
+        mismatches += ours.colliderect(Rect(*other)) != theirs.colliderect(pygame.Rect(*other))
+    return mismatches
+
+def check_vectors(samples, seed=2):
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(samples):
+        a, b = (rng.uniform(-500, 500), rng.uniform(-500, 500)), (rng.uniform(-500, 500), rng.uniform(-500, 500))
+        ours, theirs = Vec2(a), pygame.Vector2(a)
+        mismatches += tuple(ours + b) != tuple(theirs + b) or tuple(ours - b) != tuple(theirs - b)
+        mismatches += ours.length() != theirs.length()
+        if ours.length():
+            length = rng.uniform(0.1, 20)
+            ours.scale_to_length(length)
+            theirs.scale_to_length(length)
+            mismatches += tuple(ours) != tuple(theirs)
+    return mismatches
+
+def trajectory(ticks, rect_cls, vec_cls):
+    saved = player_body.Rect, platform_body.Rect, platform_body.Vec2
+    player_body.Rect = platform_body.Rect = rect_cls
+    platform_body.Vec2 = vec_cls
+    try:
+        sim = forest()
+        hashes = []
+        start = time.perf_counter()
+        for snapshot in input_stream(ticks):
+            sim.step(snapshot)
+            if sim.ticks % CHECK_EVERY == 0:
+                hashes.append(sim.state_hash())
+        return hashes, time.perf_counter() - start
+    finally:
+        player_body.Rect, platform_body.Rect, platform_body.Vec2 = saved
+
+def run(samples=20000, ticks=30000):
+    rects = check_rects(samples)
+    vectors = check_vectors(samples)
+    print(f"Rect: {samples} samples, {rects} mismatching pygame.Rect")
+    print(f"Vec2: {samples} samples, {vectors} mismatching pygame.Vector2")
+
+    ours, ours_time = trajectory(ticks, Rect, Vec2)
+    theirs, theirs_time = trajectory(ticks, pygame.Rect, pygame.Vector2)
+    diverged = next((i for i, (a, b) in enumerate(zip(ours, theirs)) if a != b), None)
+    print(f"trajectory over {ticks} ticks: " +
+          ("same state at every check" if diverged is None else f"DIVERGED by tick {(diverged + 1) * CHECK_EVERY}"))
+    print(f"  geometry  {ticks / ours_time:9,.0f} ticks/s")
+    print(f"  pygame    {ticks / theirs_time:9,.0f} ticks/s")
+    return rects == 0 and vectors == 0 and diverged is None and len(ours) == len(theirs)
+
+if __name__ == "__main__":
+    sys.exit(0 if run(*(int(a) for a in sys.argv[1:3])) else 1)
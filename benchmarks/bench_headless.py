@@ -0,0 +1,50 @@
+"""Headless simulation throughput and determinism, no pygame involved.
+
+    python -m benchmarks.bench_headless [ticks]
+
+Runs the Forest stage on a random (but seeded) input stream twice and checks
+both runs end in the same state.
+"""
+import random
+import sys
+import time
+
+from input_state import NO_INPUT
+from platform_body import MovingPlatformBody
+from simulation import Simulation
+
+TILE = 16 * 4
+
+def forest(screen_h=1080):
+    """The Forest stage as Purple_core_main.py sets it up, minus the sprites."""
+    platforms = [MovingPlatformBody((70 * TILE, 29 * TILE), (90 * TILE, 29 * TILE), 4, (32 * 4, 16 * 4))]
+    return Simulation.from_map("Forest_map.csv", (3 * TILE, 0), platforms, TILE, screen_h)
+
+def input_stream(ticks, seed=1):
+    # Flip a random action every few ticks, enough to hit dashes, slides and summons
+    rng = random.Random(seed)
+    held, snapshot = 0, NO_INPUT
+    for _ in range(ticks):
+        if rng.random() < 0.15:
+            held ^= 1 << rng.randrange(5)
+        snapshot = snapshot.next(held)
+        yield snapshot
+
+def run(ticks=60000):
+    inputs = list(input_stream(ticks))
+    hashes = []
+    for attempt in range(2):
+        sim = forest()
+        start = time.perf_counter()
+        sim.run(inputs)
+        elapsed = time.perf_counter() - start
+        hashes.append(sim.state_hash())
+        print(f"run {attempt + 1}: {ticks} ticks in {elapsed:.2f} s, {ticks / elapsed:,.0f} ticks/s "
+              f"({ticks / 60 / elapsed:.0f}x real time)  state {hashes[-1][:12]}")
+    print("deterministic" if hashes[0] == hashes[1] else "MISMATCH")
+    print("pygame imported" if "pygame" in sys.modules else "pygame never imported")
+    return hashes[0] == hashes[1]
+
+if __name__ == "__main__":
+    ok = run(int(sys.argv[1]) if len(sys.argv) > 1 else 60000)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,50 @@
+"""CSV parsing vs memory-mapped compiled maps on a synthetic map.
+
+    python -m benchmarks.bench_maploader [size]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from maploader import Maploader
+
+def write_synthetic_csv(path, size, seed=1):
+    # Mostly air with bands of ground, roughly like a real stage
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        for r in range(size):
+            if r % 16 > 11:
+                row = [str(rng.randrange(0, 600)) for _ in range(size)]
+            else:
+                row = ["-1" if rng.random() < 0.9 else str(rng.randrange(0, 800)) for _ in range(size)]
+            f.write(",".join(row) + ",\n")
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def run(size=4096):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"synthetic_{size}.csv")
+        print(f"writing {size}x{size} map...")
+        write_synthetic_csv(path, size)
+        print(f"csv size: {os.path.getsize(path) / 1e6:.1f} MB")
+
+        parse_s, parsed = timed(Maploader(path, use_cache=False).load)
+        compile_s, _ = timed(lambda: Maploader(path).compile([parsed]))
+        load_s, grid = timed(Maploader(path).load)
+        # mmap is lazy, so also time the first full pass over the cells
+        touch_s, _ = timed(grid.unique_ids)
+        print(f"csv parse        {parse_s * 1000:9.1f} ms")
+        print(f"compile          {compile_s * 1000:9.1f} ms")
+        print(f"binary load      {load_s * 1000:9.1f} ms")
+        print(f"binary + 1 scan  {(load_s + touch_s) * 1000:9.1f} ms")
+        print(f"compiled size: {os.path.getsize(path + '.pcmap') / 1e6:.1f} MB")
+        assert grid.shape == parsed.shape and grid.view == parsed.view
+        del grid  # release the mmap before the temp dir goes away
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 4096)
@@ -0,0 +1,45 @@
+"""Surface allocations and time per frame for Player.draw during a long dash.
+
+    SDL_VIDEODRIVER=dummy python -m benchmarks.bench_player_draw
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from Player import Player
+from surface_counter import SurfaceCounter
+
+def dash_frame(player, frame):
+    # Keep the player dashing and turning around every second
+    player.current_time = frame * 16
+    player.is_dashing, player.state = True, "dash"
+    player.facing_right = (frame // 60) % 2 == 0
+    player.animate()
+    player.create_ghost()
+
+def run(frames=600, warmup=60):
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    player = Player(600, 300, "Purple_core_player.png", (0, 255, 0), 2, 48)
+
+    for frame in range(warmup):
+        dash_frame(player, frame)
+        player.draw(screen, 0, 0)
+
+    with SurfaceCounter() as allocs:
+        start = time.perf_counter()
+        for frame in range(warmup, warmup + frames):
+            dash_frame(player, frame)
+            player.draw(screen, 0, 0)
+        elapsed = time.perf_counter() - start
+
+    print(f"frames:          {frames}")
+    print(f"draw time:       {elapsed / frames * 1e6:.1f} us/frame")
+    print(f"allocations:     {allocs.count} ({allocs.count / frames:.2f}/frame) {dict(allocs.by_source)}")
+    print(f"ghost images:    {len(player.ghost_images)}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    run()
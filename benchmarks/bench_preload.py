@@ -0,0 +1,57 @@
+"""Wall-clock startup with the stage's sheets decoded on 1, 2, 4 and 8 threads.
+
+    python -m benchmarks.bench_preload [runs]
+
+Each run is a fresh interpreter with the disk cache off, so every sheet
+really gets decoded. Times the preload on its own (decode on the pool plus
+the convert pass) and the whole Game() init, "lazy" is no preload stage,
+sheets decoded one by one as the stage first needs them. Only helps as far
+as there are cores to spread the decoding over.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+WORKERS = (0, 1, 2, 4, 8)
+
+def child(workers):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from assets import AssetManager
+    from Purple_core_main import Game, STAGE_SHEETS
+    pygame.init()
+    screen = pygame.display.set_mode((1920, 1080))
+    preload = None
+    if workers:
+        start = time.perf_counter()
+        AssetManager().preload(STAGE_SHEETS, workers)
+        preload = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    Game(screen, asset_cache=False, preload_workers=workers).unload()
+    print(json.dumps({"preload": preload, "game": (time.perf_counter() - start) * 1000}))
+
+def measure(workers):
+    args = [sys.executable, "-m", "benchmarks.bench_preload", "--child", str(workers)]
+    out = subprocess.run(args, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def run(runs=5):
+    print(f"{os.cpu_count()} cpus, median of {runs} runs")
+    for workers in WORKERS:
+        results = [measure(workers) for _ in range(runs)]
+        game = statistics.median(r["game"] for r in results)
+        if workers:
+            preload = statistics.median(r["preload"] for r in results)
+            print(f"  {workers} workers  preload {preload:6.1f} ms   Game() {game:6.1f} ms")
+        else:
+            print(f"  lazy       {'':17}   Game() {game:6.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(int(sys.argv[2]))
+    else:
+        sys.exit(run(*(int(a) for a in sys.argv[1:2])))
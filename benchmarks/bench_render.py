@@ -0,0 +1,86 @@
+"""Frame draw time, native SCALE rendering vs the low-res target, at 1080p and 4K.
+
+    SDL_VIDEODRIVER=dummy python -m benchmarks.bench_render [--save-frames DIR]
+"""
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from Background import ParallaxBackground
+from mapdraw import Mapdraw
+from moving_platform import MovingPlatform
+from Player import Player
+from UI import GameUI
+
+TILE_SIZE, SCALE = 16, 4
+SIZES = {"1080p": (1920, 1080), "4K": (3840, 2160)}
+
+class Scene:
+    """The Forest stage drawn the way Purple_core_main.py draws it."""
+
+    def __init__(self, size, low_res):
+        self.size = size
+        self.low_res = low_res
+        rs = 1 / SCALE if low_res else 1
+        self.screen = pygame.Surface(size).convert()
+        if low_res:
+            self.target = pygame.Surface((size[0] // SCALE, size[1] // SCALE)).convert()
+            self.upscaled = self.screen.subsurface((0, 0, self.target.get_width() * SCALE, self.target.get_height() * SCALE))
+        else:
+            self.target = self.screen
+        tw, th = self.target.get_size()
+
+        ts = TILE_SIZE * SCALE
+        self.map = Mapdraw("Forest_stage.png", "Forest_map.csv", (255, 255, 255), TILE_SIZE, SCALE, render_scale=rs)
+        self.player = Player(3 * ts, 0, "Purple_core_player.png", (0, 255, 0), SCALE // 2, 48, render_scale=rs)
+        self.ui = GameUI(self.player, "UI_stuff.png", render_scale=rs)
+        self.platforms = [MovingPlatform("Forest_moving_platform.png", (70 * ts, 29 * ts), (90 * ts, 29 * ts),
+                                         speed=4, width=32, height=16, scale=SCALE, frames_count=1, render_scale=rs)]
+        self.background = ParallaxBackground("Forest_stage_background.png", tw, th, scroll_speed=0.5, render_scale=rs)
+
+    def draw(self, camera_x, camera_y):
+        self.player.hitbox.midbottom = (camera_x + self.size[0] // 2, camera_y + self.size[1] // 2)
+        self.background.draw(self.target, camera_x)
+        self.map.draw(self.target, camera_x, camera_y)
+        for plat in self.platforms:
+            plat.draw(self.target, camera_x, camera_y)
+        self.player.draw(self.target, camera_x, camera_y)
+        self.ui.draw(self.target)
+        if self.low_res:
+            pygame.transform.scale(self.target, self.upscaled.get_size(), self.upscaled)
+
+def camera_path(scene, frames):
+    map_w, map_h = scene.map.map_size()
+    max_x, max_y = max(0, map_w - scene.size[0]), max(0, map_h - scene.size[1])
+    return [(int(max_x * i / frames), int(max_y * (0.3 + 0.7 * i / frames))) for i in range(frames)]
+
+def run(frames=120, save_dir=None):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    for label, size in SIZES.items():
+        for low_res in (False, True):
+            scene = Scene(size, low_res)
+            path = camera_path(scene, frames)
+            for cam in path[:10]:
+                scene.draw(*cam)  # build chunks and caches first
+            times = []
+            for cam in path:
+                start = time.perf_counter()
+                scene.draw(*cam)
+                times.append(time.perf_counter() - start)
+            times.sort()
+            mode = "lowres" if low_res else "native"
+            print(f"{label:6s} {mode:7s} median {statistics.median(times) * 1000:7.2f} ms   "
+                  f"p95 {times[int(len(times) * 0.95)] * 1000:7.2f} ms")
+            if save_dir:
+                scene.draw(*path[len(path) // 2])
+                pygame.image.save(scene.screen, os.path.join(save_dir, f"{label}_{mode}.png"))
+    pygame.quit()
+
+if __name__ == "__main__":
+    save = sys.argv[sys.argv.index("--save-frames") + 1] if "--save-frames" in sys.argv else None
+    run(save_dir=save)
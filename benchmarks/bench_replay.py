@@ -0,0 +1,81 @@
+"""Replay corpus throughput, and a corpus with broken files in it.
+
+    python -m benchmarks.bench_replay [ticks]
+
+Records a few headless runs of the Forest stage, writes damaged copies next
+to them (cut-off input, a file shorter than the header, a header cut short,
+an empty header, a header with junk in it) and verifies the lot through
+replay.run_corpus on a process pool. The good replays have to pass and
+every broken one has to come back as a failure with an error, without
+taking the rest of the corpus down. No pygame.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import replay
+from benchmarks.bench_headless import forest, input_stream
+
+RUNS = 3
+
+def record(path, ticks, seed):
+    sim = forest()
+    recorder = replay.Recorder(sim, "Forest_map.csv")
+    for snapshot in input_stream(ticks, seed):
+        sim.step(snapshot)
+        recorder.record(snapshot)
+    recorder.save(path)
+
+def with_header(data, header):
+    """data with its JSON header swapped for header (bytes)."""
+    _, _, size = replay.HEADER.unpack_from(data)
+    return replay.HEADER.pack(replay.MAGIC, replay.VERSION, len(header)) + header + data[replay.HEADER.size + size:]
+
+def damaged(data):
+    """name -> broken copy of one good replay's bytes."""
+    _, _, size = replay.HEADER.unpack_from(data)
+    header = json.loads(data[replay.HEADER.size:replay.HEADER.size + size])
+    junk = dict(header, platforms=5)
+    return {
+        "truncated_run": data[:-1] + bytes((data[-1] | 0x80,)),
+        "short_file": data[:2],
+        "truncated_header": data[:replay.HEADER.size + size // 2],
+        "empty_header": with_header(data, b"{}"),
+        "junk_header": with_header(data, json.dumps(junk).encode()),
+    }
+
+def run(ticks=3600):
+    with tempfile.TemporaryDirectory() as corpus:
+        good = []
+        for seed in range(RUNS):
+            good.append(os.path.join(corpus, f"run{seed}{replay.SUFFIX}"))
+            record(good[-1], ticks, seed)
+        with open(good[0], 'rb') as f:
+            data = f.read()
+        bad = []
+        for name, blob in damaged(data).items():
+            bad.append(os.path.join(corpus, f"bad_{name}{replay.SUFFIX}"))
+            with open(bad[-1], 'wb') as f:
+                f.write(blob)
+
+        start = time.perf_counter()
+        results = {r["path"]: r for r in replay.run_corpus(good + bad, jobs=2)}
+        wall = time.perf_counter() - start
+
+    ok = True
+    for path in good:
+        r = results[path]
+        ok &= r["ok"]
+        print(f"{'ok  ' if r['ok'] else 'FAIL'} {os.path.basename(path)}: {r['ticks']} ticks in {r['seconds']:.2f} s")
+    for path in bad:
+        r = results[path]
+        caught = not r["ok"] and "error" in r
+        ok &= caught
+        print(f"{'ok  ' if caught else 'FAIL'} {os.path.basename(path)}: {r.get('error', 'not reported as broken')}")
+    print(f"{len(results)} files in {wall:.2f} s wall")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if run(*(int(a) for a in sys.argv[1:2])) else 1)
@@ -0,0 +1,58 @@
+"""How long Game() takes to build with and without the sprite cache on disk.
+
+    python -m benchmarks.bench_startup [runs]
+
+Every run is a fresh interpreter so nothing is resident yet: no cache at
+all, a cold cache (cleared first, so the run also writes it) and a warm
+one. Reports the median init time for each render mode.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = ("none", "cold", "warm")
+
+def child(mode, low_res):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import asset_cache
+    from assets import ASSETS
+    from Purple_core_main import Game
+    if mode == "cold":
+        asset_cache.clear()
+    pygame.init()
+    screen = pygame.display.set_mode((1920, 1080))
+    start = time.perf_counter()
+    game = Game(screen, low_res=low_res, asset_cache=mode != "none")
+    elapsed = time.perf_counter() - start
+    stats = ASSETS.disk.stats() if ASSETS.disk is not None else {}
+    game.unload()
+    print(json.dumps({"ms": elapsed * 1000, "cache": stats}))
+
+def measure(mode, low_res):
+    args = [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode, str(int(low_res))]
+    out = subprocess.run(args, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def run(runs=5):
+    for low_res in (False, True):
+        print("lowres" if low_res else "native")
+        for mode in MODES:
+            if mode == "warm":
+                measure("cold", low_res)   # make sure there's something to map
+            results = [measure(mode, low_res) for _ in range(runs)]
+            line = f"  {mode:5} {statistics.median(r['ms'] for r in results):7.1f} ms"
+            cache = results[-1]["cache"]
+            if cache:
+                line += f"   {cache['hits']} hits, {cache['misses']} misses"
+            print(line)
+    return 0
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3] == "1")
+    else:
+        sys.exit(run(*(int(a) for a in sys.argv[1:2])))
@@ -0,0 +1,141 @@
+"""Check CollisionGrid.sweep_x / sweep_y against moving a box one pixel at a
+time, show a fast fall tunnelling without the sweep, and time the sweep
+against substepping the per-tile check. No pygame.
+
+    python -m benchmarks.bench_sweep [samples]
+
+Exits non-zero if a sweep mismatches the pixel walk or the swept fall
+misses the floor.
+"""
+import random
+import sys
+import time
+
+from collision import CollisionGrid, SOLID, BRIDGE, tile_properties
+from geometry import Rect
+from maploader import Maploader
+from player_body import PlayerBody
+
+def pixel_sweep(collision, rect, delta, mask, vertical):
+    """Reference: nudge the box a pixel at a time until it overlaps a new mask cell."""
+    ts = collision.tile_size
+    step = 1 if delta > 0 else -1
+    def cells(box):
+        return {(c, r) for c, r, f in collision.cells_in_rect(box, mask)
+                if c * ts < box.right and box.left < (c + 1) * ts and r * ts < box.bottom and box.top < (r + 1) * ts}
+    start = cells(rect)
+    for k in range(1, abs(delta) + 1):
+        box = rect.copy()
+        if vertical: box.y += k * step
+        else: box.x += k * step
+        new = sorted(cells(box) - start, key=lambda cr: (cr[1], cr[0]) if not vertical else (cr[0], cr[1]))
+        if new:
+            c, r = new[0]
+            return (k - 1) / abs(delta), c, r, collision.flags_at(c, r)
+    return None
+
+def samples(collision, count, seed=1):
+    rng = random.Random(seed)
+    ts = collision.tile_size
+    out = []
+    for _ in range(count):
+        w, h = rng.choice(((32, 80), (48, 36), (ts // 2, ts // 2), (1, 1)))
+        x = rng.randrange(-2 * ts, collision.width_px + ts)
+        y = rng.randrange(-2 * ts, collision.height_px + ts)
+        if rng.random() < 0.3:  # start right on a tile boundary
+            x -= x % ts
+            y -= y % ts
+        d = rng.choice((-1, 1)) * rng.randrange(1, 5 * ts)
+        out.append((Rect(x, y, w, h), d, rng.random() < 0.5))
+    return out
+
+def check(collision, cases):
+    mismatches = hits = 0
+    for rect, d, vertical in cases:
+        if vertical:
+            got = collision.sweep_y(rect, d, SOLID, BRIDGE)
+            want = pixel_sweep(collision, rect, d, SOLID | (BRIDGE if d > 0 else 0), True)
+        else:
+            got = collision.sweep_x(rect, d, SOLID)
+            want = pixel_sweep(collision, rect, d, SOLID, False)
+        hits += got is not None
+        if got != want:
+            mismatches += 1
+    return mismatches, hits
+
+def thin_floor(collision):
+    """A bridge or solid tile one cell thick with open air above and below."""
+    for kind in (BRIDGE, SOLID):
+        for r in range(2, collision.rows - 2):
+            for c in range(collision.cols - 1):
+                if (collision.flags_at(c, r) & kind and collision.flags_at(c + 1, r) & kind and
+                        not any(collision.flags_at(c + dc, rr) for dc in (0, 1) for rr in (r - 2, r - 1, r + 1, r + 2))):
+                    return kind, c, r
+    return None
+
+def tunnelling(collision, c, r, fall_speed):
+    """Drop a player onto the floor at (c, r) at fall_speed px/tick, with and without the sweep."""
+    ts = collision.tile_size
+    results = []
+    for swept in (True, False):
+        p = PlayerBody(0, 0)
+        p.warp(c * ts + 8, r * ts - p.height_standing - 1)
+        start = p.hitbox.y
+        p.vel_y = fall_speed
+        p.pos_y += p.vel_y
+        p.hitbox.y = round(p.pos_y)
+        p.check_collisions(collision, 'y', start if swept else None)
+        results.append(p.on_ground)
+    return results
+
+def substep_check(collision, rect, d, vertical, max_step):
+    # What substepping costs: the per-tile scan at every intermediate position
+    n = -(-abs(d) // max_step)
+    box = rect.copy()
+    for i in range(1, n + 1):
+        offset = d * i // n
+        if vertical: box.y = rect.y + offset
+        else: box.x = rect.x + offset
+        if collision.overlaps(box, SOLID | BRIDGE):
+            for _ in collision.cells_in_rect(box, SOLID | BRIDGE):
+                pass
+            return
+
+def run(count=20000):
+    grid = Maploader("Forest_map.csv").load()
+    props = tile_properties(grid.unique_ids())
+    failed = 0
+    for ts in (64, 16):
+        collision = CollisionGrid(grid, props, ts)
+        cases = samples(collision, count)
+        mismatches, hits = check(collision, cases)
+        failed += mismatches
+        print(f"tile size {ts}: {len(cases)} sweeps, {hits} hit something, {mismatches} mismatching the pixel walk")
+
+    collision = CollisionGrid(grid, props, 64)
+    kind, c, r = thin_floor(collision)
+    print(f"\nfalling onto the {'bridge' if kind == BRIDGE else 'ledge'} at cell ({c}, {r}):")
+    for speed in (30, 70, 150):
+        swept, plain = tunnelling(collision, c, r, speed)
+        failed += not swept
+        print(f"  at {speed:3d} px/tick: lands {'yes' if swept else 'NO '} with the sweep, "
+              f"{'yes' if plain else 'NO '} without")
+
+    fast = [(r, d, v) for r, d, v in samples(collision, count, seed=2) if abs(d) >= collision.tile_size]
+    start = time.perf_counter()
+    for rect, d, vertical in fast:
+        if vertical: collision.sweep_y(rect, d, SOLID, BRIDGE)
+        else: collision.sweep_x(rect, d, SOLID)
+    sweep_time = time.perf_counter() - start
+    print(f"\n{len(fast)} moves of a tile or more:")
+    print(f"  sweep             {sweep_time / len(fast) * 1e6:6.2f} us/move")
+    for step in (32, 16):
+        start = time.perf_counter()
+        for rect, d, vertical in fast:
+            substep_check(collision, rect, d, vertical, step)
+        elapsed = time.perf_counter() - start
+        print(f"  substeps of {step:2d} px {elapsed / len(fast) * 1e6:6.2f} us/move")
+    return failed == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000) else 1)
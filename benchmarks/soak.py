@@ -0,0 +1,136 @@
+"""Soak test: the real game loop on a scripted Forest stage playthrough.
+
+    python -m benchmarks.soak [--frames 30000] [--window 5000] [--size 1280x720]
+                              [--lowres] [--no-tracemalloc] [--max-growth-kb 512]
+
+One tick per frame, rendering on, dummy video driver. The script runs,
+jumps, swims, dashes, slides, summons platforms, drops through a bridge,
+rides the moving platform and falls into the spikes, warping the player
+between sections, over and over. Every window it prints frame-time
+percentiles, surfaces allocated and traced memory. After the first window
+(caches warming up) memory should stay flat. The run fails if it grows by
+more than --max-growth-kb.
+
+tracemalloc makes everything a few times slower, pass --no-tracemalloc for
+representative frame times.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from input_state import NO_INPUT, LEFT, RIGHT, JUMP, DOWN, SLIDE
+from Purple_core_main import Game
+from surface_counter import SurfaceCounter
+
+TS = 16 * 4
+
+def tiles(col, row):
+    return col * TS, row * TS
+
+def riding_spot(game):
+    # Just above wherever the moving platform is right now
+    rect = game.moving_platforms[0].rect
+    return rect.centerx - 16, rect.top - 90
+
+# (name, where to warp or None, [(held actions, ticks), ...])
+SCRIPT = [
+    ("run", lambda g: tiles(3, 30), [(RIGHT, 30), (RIGHT | JUMP, 5), (RIGHT, 40), (RIGHT | JUMP, 5)] * 4),
+    ("swim", lambda g: tiles(34, 29), [(RIGHT, 60), (RIGHT | JUMP, 5), (RIGHT, 20), (LEFT, 60), (JUMP, 5), (0, 30)]),
+    ("dash", lambda g: tiles(6, 30), [(RIGHT, 3), (0, 3), (RIGHT, 20), (0, 40), (LEFT, 3), (0, 3), (LEFT, 20), (0, 40)] * 2),
+    ("slide", lambda g: tiles(6, 30), [(RIGHT, 10), (RIGHT | SLIDE, 50), (0, 20), (LEFT, 10), (LEFT | SLIDE, 50), (0, 20)]),
+    ("summon", lambda g: tiles(14, 30), [(JUMP, 4), (0, 14), (DOWN, 3), (0, 40)] * 3),
+    ("bridge", lambda g: tiles(34, 26), [(0, 40), (DOWN, 20), (0, 40)]),
+    ("ride", riding_spot, [(0, 420), (RIGHT, 30)]),
+    ("spikes", lambda g: tiles(80, 27), [(0, 90), (LEFT, 10), (0, 90), (RIGHT, 10), (0, 200)]),
+]
+
+def playthrough(game):
+    """Endless InputSnapshots following SCRIPT, warps happen between sections."""
+    snapshot = NO_INPUT
+    while True:
+        for name, where, moves in SCRIPT:
+            if where is not None:
+                game.player.warp(*where(game))
+            for held, ticks in moves:
+                for _ in range(ticks):
+                    snapshot = snapshot.next(held)
+                    yield snapshot
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+def run(frames=30000, window=5000, size=(1280, 720), low_res=False, trace=True, max_growth_kb=512):
+    if trace:
+        tracemalloc.start(10)
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    game = Game(screen, low_res=low_res, fps=0)
+    game.replay_inputs = playthrough(game)
+    frame_ms = 1000 / game.timestep.tick_rate
+
+    baseline = None
+    first_mem = None
+    hits = 0
+    print(f"{'frames':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s} {'surfaces':>9s} {'traced KB':>10s}")
+    with SurfaceCounter() as allocs:
+        done = 0
+        while done < frames:
+            times = []
+            allocs.reset()
+            for _ in range(min(window, frames - done)):
+                start = time.perf_counter()
+                game.run(max_frames=1, frame_ms=frame_ms)
+                times.append((time.perf_counter() - start) * 1000)
+                if game.player.invincible and game.player.invincibility_timer == game.player.current_time:
+                    hits += 1
+            done += len(times)
+            times.sort()
+            mem = tracemalloc.get_traced_memory()[0] / 1024 if trace else 0
+            print(f"{done:8d} {percentile(times, 0.5):8.2f} {percentile(times, 0.95):8.2f} "
+                  f"{percentile(times, 0.99):8.2f} {times[-1]:8.2f} {allocs.count:9d} {mem:10.0f}"
+                  + (f"   {dict(allocs.by_source)}" if allocs.count else ""))
+            if trace and baseline is None:
+                # Everything after the first window should be steady state
+                baseline = tracemalloc.take_snapshot()
+                first_mem = mem
+
+    player = game.player
+    print(f"\nplayer: {hits} spike hits, {len(player.ghosts)} ghosts alive, "
+          f"tile library {game.Forest_map.tile_images.stats()}, entities {game.sim.entities.stats()}, "
+          f"assets {game.assets.manager.stats()}" + (f", atlas {game.atlas.stats()}" if game.atlas else ""))
+    print("phases (last 600 frames, ms p50/p99): " +
+          ", ".join(f"{k} {v[0]:.2f}/{v[1]:.2f}" for k, v in game.profiler.summary().items()))
+
+    ok = True
+    if trace and first_mem is not None:
+        growth = mem - first_mem
+        print(f"\ntraced memory growth after warm-up: {growth:+.0f} KB")
+        top = [s for s in tracemalloc.take_snapshot().compare_to(baseline, "lineno") if s.size_diff > 0][:8]
+        for stat in top:
+            print(f"  {stat}")
+        if growth > max_growth_kb:
+            print(f"FAIL: grew more than {max_growth_kb} KB")
+            ok = False
+        tracemalloc.stop()
+    pygame.quit()
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless soak run of the Forest stage")
+    parser.add_argument("--frames", type=int, default=30000)
+    parser.add_argument("--window", type=int, default=5000, help="frames per report line")
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--lowres", action="store_true")
+    parser.add_argument("--no-tracemalloc", dest="trace", action="store_false")
+    parser.add_argument("--max-growth-kb", type=float, default=512)
+    args = parser.parse_args(argv)
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    return 0 if run(args.frames, args.window, size, args.lowres, args.trace, args.max_growth_kb) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""Microbenchmarks for the map, sprite and physics hot paths.
+
+    SDL_VIDEODRIVER=dummy python -m benchmarks.suite [--only PATTERN] [--samples N]
+                                                     [--save BASELINE.json]
+                                                     [--compare BASELINE.json] [--threshold 0.10]
+    python -m benchmarks.suite --compare OLD.json --against NEW.json
+
+Every case reports median, p95 and p99 time per call. --save writes the
+results as a JSON baseline, --compare checks this run against one and exits
+non-zero if any median got slower by more than --threshold (0.10 = 10%).
+With --against two saved runs are compared and nothing is timed.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from assets import AssetManager
+from Background import ParallaxBackground
+from input_state import NO_INPUT, LEFT, RIGHT, JUMP, DOWN, SLIDE
+from mapdraw import Mapdraw
+from maploader import Maploader
+from Player import Player
+from spritesheet import SpriteSheet
+
+TILE_SIZE, SCALE = 16, 4
+TS = TILE_SIZE * SCALE
+SIZES = {"720p": (1280, 720), "1080p": (1920, 1080), "4K": (3840, 2160)}
+
+CASES = []
+
+def case(name):
+    """Register a benchmark. The function does the setup and returns the callable to time."""
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+    return register
+
+# --- Map ---
+
+@case("maploader.load")
+def _():
+    return Maploader("Forest_map.csv").load
+
+@case("maploader.parse_csv")
+def _():
+    return Maploader("Forest_map.csv", use_cache=False).parse
+
+_mapdraw = None
+def forest_map():
+    global _mapdraw
+    if _mapdraw is None:
+        _mapdraw = Mapdraw("Forest_stage.png", "Forest_map.csv", (255, 255, 255), TILE_SIZE, SCALE)
+    return _mapdraw
+
+@case("mapdraw.generate_tile_library")
+def _():
+    m = forest_map()
+    return lambda: m.generate_tile_library(TILE_SIZE)
+
+def camera_positions(m, size):
+    map_w, map_h = m.map_size()
+    max_x, max_y = max(0, map_w - size[0]), max(0, map_h - size[1])
+    return {"start": (0, max_y), "middle": (max_x // 2, max_y // 2), "end": (max_x, max_y)}
+
+def mapdraw_case(label, size, where):
+    @case(f"mapdraw.draw[{label},{where}]")
+    def _():
+        m = forest_map()
+        surface = pygame.Surface(size).convert()
+        cam = camera_positions(m, size)[where]
+        m.draw(surface, *cam)  # bake the chunks first, we time the steady state
+        return lambda: m.draw(surface, *cam)
+
+for label, size in SIZES.items():
+    for where in ("start", "middle", "end"):
+        mapdraw_case(label, size, where)
+
+# --- Sprites ---
+
+@case("spritesheet.get_strip")
+def _():
+    # Released straight away, so every call cuts and scales the frames again
+    sheet = SpriteSheet("Purple_core_player.png", assets=AssetManager())
+    def cut():
+        for frame in sheet.get_strip(0, 10, 48, 48, SCALE // 2, (0, 255, 0)):
+            sheet.release(frame)
+    return cut
+
+@case("spritesheet.get_strip[shared]")
+def _():
+    # Someone already holds the frames, the usual case for a second platform or player
+    sheet = SpriteSheet("Purple_core_player.png", assets=AssetManager())
+    sheet.get_strip(0, 10, 48, 48, SCALE // 2, (0, 255, 0))
+    def cut():
+        for frame in sheet.get_strip(0, 10, 48, 48, SCALE // 2, (0, 255, 0)):
+            sheet.release(frame)
+    return cut
+
+@case("background.draw[1080p]")
+def _():
+    surface = pygame.Surface(SIZES["1080p"]).convert()
+    bg = ParallaxBackground("Forest_stage_background.png", *SIZES["1080p"], scroll_speed=0.5)
+    cam = [0]
+    def draw():
+        cam[0] += 7
+        bg.draw(surface, cam[0])
+    return draw
+
+# --- Physics ---
+
+# Run right, jump, dash, slide, summon a platform, run back, over and over
+SCRIPT = ([RIGHT] * 40 + [RIGHT | JUMP] * 6 + [RIGHT] * 20 + [0] * 4 + [RIGHT] * 2 + [0] * 2 + [RIGHT] * 20
+          + [RIGHT | SLIDE] * 30 + [JUMP] * 4 + [0] * 10 + [DOWN] * 4 + [0] * 20 + [LEFT] * 60 + [0] * 30)
+
+@case("player.update[scripted]")
+def _():
+    m = forest_map()
+    collision = m.compile_collision()
+    player = Player(3 * TS, 0, "Purple_core_player.png", (0, 255, 0), SCALE // 2, 48)
+    state = {"tick": 0, "input": NO_INPUT}
+    def update():
+        tick = state["tick"]
+        state["input"] = state["input"].next(SCRIPT[tick % len(SCRIPT)])
+        player.update(collision, 1080, [], tick * 1000 // 60, state["input"])
+        state["tick"] = tick + 1
+    return update
+
+# --- Harness ---
+
+def percentile(sorted_times, p):
+    return sorted_times[min(len(sorted_times) - 1, int(len(sorted_times) * p))]
+
+def measure(fn, samples=200, min_sample_s=0.001, warmup=5):
+    """Per-call times in seconds. Fast calls are batched so each sample is at least min_sample_s."""
+    for _ in range(warmup):
+        fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_sample_s or number >= 1 << 20:
+            break
+        number *= 2
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    times.sort()
+    return times, number
+
+def run(only=None, samples=200):
+    results = {}
+    for name, setup in CASES:
+        if only and not fnmatch.fnmatch(name, only):
+            continue
+        times, number = measure(setup(), samples)
+        results[name] = {
+            "median_us": percentile(times, 0.5) * 1e6,
+            "p95_us": percentile(times, 0.95) * 1e6,
+            "p99_us": percentile(times, 0.99) * 1e6,
+            "samples": samples,
+            "calls_per_sample": number,
+        }
+        r = results[name]
+        print(f"{name:40s} median {r['median_us']:10.1f} us   p95 {r['p95_us']:10.1f} us   p99 {r['p99_us']:10.1f} us")
+    return results
+
+def compare(results, baseline, threshold):
+    """Print old vs new medians, returns the names that got slower than threshold."""
+    regressions = []
+    print(f"\n{'case':40s} {'baseline':>12s} {'now':>12s}  change")
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:40s} {'-':>12s} {new['median_us']:10.1f}us  (new)")
+            continue
+        change = new["median_us"] / old["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:40s} {old['median_us']:10.1f}us {new['median_us']:10.1f}us  {change:+7.1%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Purple Core microbenchmarks")
+    parser.add_argument("--only", help="glob of case names to run, e.g. 'mapdraw.*'")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed median slowdown, 0.10 = 10%%")
+    parser.add_argument("--against", metavar="PATH", help="compare this saved run instead of running now")
+    args = parser.parse_args(argv)
+
+    if args.against:
+        with open(args.against) as f:
+            results = json.load(f)["results"]
+    else:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        results = run(args.only, args.samples)
+        pygame.quit()
+
+    if args.save and not args.against:
+        meta = {"python": platform.python_version(), "pygame": pygame.version.ver,
+                "machine": platform.platform(), "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+        with open(args.save, 'w') as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+        print("\nno regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import pygame
+from collections import OrderedDict
+from assets import optimize
+from tile_grid import EMPTY
+
+class MapChunk:
+    __slots__ = ("surface", "animated")
+
+    def __init__(self, surface, animated):
+        self.surface = surface      # None when the chunk has no static tiles
+        self.animated = animated    # [(x, y, frames)] in map pixels
+
+class ChunkCache:
+    """Bakes the static tiles of a map into chunk_size x chunk_size tile surfaces.
+
+    Chunks are built the first time the camera sees them and the least recently
+    drawn ones are dropped once more than `max_chunks` are alive. Keep the budget
+    above the number of chunks one screen covers or they get rebuilt every frame.
+    """
+    def __init__(self, grid, tile_images, animations, tile_size, chunk_size=8, max_chunks=64, optimize=True, colorkey=None):
+        self.grid = grid
+        self.tile_images = tile_images
+        self.animations = animations
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size
+        self.chunk_px = chunk_size * tile_size
+        self.max_chunks = max_chunks
+        self.optimize = optimize
+        # What the tiles were cut with, chunks of only opaque tiles get keyed with it
+        self.colorkey = None if colorkey is None else tuple(colorkey)
+
+        rows = len(grid)
+        cols = len(grid[0]) if rows else 0
+        self.cols = -(-cols // chunk_size)
+        self.rows = -(-rows // chunk_size)
+
+        self.chunks = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cx, cy):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.hits += 1
+            self.chunks.move_to_end(key)
+            return chunk
+
+        self.misses += 1
+        chunk = self.build(cx, cy)
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def build(self, cx, cy):
+        ts = self.tile_size
+        first_row, first_col = cy * self.chunk_size, cx * self.chunk_size
+        last_row = min(len(self.grid), first_row + self.chunk_size)
+        last_col = min(len(self.grid[0]), first_col + self.chunk_size)
+
+        tiles = []
+        animated = []
+        for row in range(first_row, last_row):
+            grid_row = self.grid[row]
+            for col in range(first_col, last_col):
+                tid = grid_row[col]
+                if tid == EMPTY:
+                    continue
+                if tid in self.animations:
+                    # Animated tiles stay out of the bake and are drawn on top each frame
+                    animated.append((col * ts, row * ts, self.animations[tid]))
+                elif tid in self.tile_images:
+                    tiles.append((self.tile_images[tid], ((col - first_col) * ts, (row - first_row) * ts)))
+        if not tiles:
+            return MapChunk(None, animated)
+
+        size = (self.chunk_px, self.chunk_px)
+        translucent = any(image.get_flags() & pygame.SRCALPHA for image, _ in tiles)
+        keys = {image.get_colorkey() for image, _ in tiles} - {None}
+        key = next(iter(keys), self.colorkey)
+        covered = len(tiles) == (last_row - first_row) * (last_col - first_col) == self.chunk_size ** 2
+        if self.optimize and not translucent and len(keys) <= 1 and (key is not None or covered):
+            # Every tile is opaque or keyed the same way (the usual case after
+            # assets.optimize), bake straight into a surface keyed like them, no
+            # need to look at the pixels. optimize() only leaves a tile unkeyed
+            # when none of its pixels are the key it was cut with.
+            surface = pygame.Surface(size).convert()
+            if key is not None:
+                surface.fill(key)
+                surface.blits(tiles, doreturn=False)
+                surface.set_colorkey(key, pygame.RLEACCEL)
+            else:
+                surface.blits(tiles, doreturn=False)   # solid all the way across
+        else:
+            surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            surface.blits(tiles, doreturn=False)
+            if self.optimize:
+                # Solid ground chunks blit as plain copies, the rest skip their empty runs
+                surface = optimize(surface)
+        return MapChunk(surface, animated)
+
+    def visible(self, camera_x, camera_y, view_w, view_h):
+        """Return [(cx, cy, chunk)] for every chunk overlapping the view."""
+        first_cx = max(0, int(camera_x // self.chunk_px))
+        first_cy = max(0, int(camera_y // self.chunk_px))
+        last_cx = min(self.cols, int((camera_x + view_w) // self.chunk_px) + 1)
+        last_cy = min(self.rows, int((camera_y + view_h) // self.chunk_px) + 1)
+        return [(cx, cy, self.get(cx, cy))
+                for cy in range(first_cy, last_cy)
+                for cx in range(first_cx, last_cx)]
+
+    def invalidate(self):
+        self.chunks.clear()
+
+    def resident_bytes(self):
+        return sum(c.surface.get_pitch() * c.surface.get_height()
+                   for c in self.chunks.values() if c.surface is not None)
+
+    def stats(self):
+        return {
+            "resident": len(self.chunks),
+            "resident_bytes": self.resident_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
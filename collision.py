@@ -0,0 +1,282 @@
+from array import array
+from tile_grid import EMPTY
+
+# Per-cell flag bits
+SOLID = 1
+BRIDGE = 2
+LIQUID = 4
+DAMAGE = 8
+
+# Forest stage tile rules, by Tiled ID
+WATER_TILES = [213, 13, 113, 307, 312]
+DECORATION_TILES = [107, 207, 112, 212]
+BRIDGE_TILES = [7, 8, 9, 10, 11, 12]
+HAZARD_TILES = [500]
+
+def tile_properties(tile_ids):
+    """Physics properties for each tile ID, based on Tiled ID ranges."""
+    props = {}
+    for tid in tile_ids:
+        # 1. Start with the broad "Solid" rule for rows 1-6
+        if 0 <= tid <= 599:
+            props[tid] = {"solid": True, "type": "ground"}
+        else:
+            props[tid] = {"solid": False, "type": "decoration"}
+
+        # 2. Refine with specific overrides (Order matters!)
+        if tid in WATER_TILES:
+            props[tid] = {"solid": False, "type": "liquid"}
+
+        elif tid in BRIDGE_TILES:
+            # Note: Bridges are usually solid:False so you can jump THROUGH them,
+            # but the 'standing on top' logic is in the player body
+            props[tid] = {"solid": False, "type": "bridge"}
+
+        elif tid in DECORATION_TILES:
+            props[tid] = {"solid": False, "type": "decoration"}
+
+        # 3. Hazards (Set damage)
+        if tid in HAZARD_TILES:
+            props[tid]["damage"] = 1
+            # Usually, spikes aren't "solid" so you can fall into them
+            props[tid]["solid"] = False
+
+    return props
+
+def greedy_merge(flags, cols, rows, mask):
+    """Cover the cells that have any of the mask bits with as few rects as the
+    greedy way finds: grow right as far as possible, then down while the whole
+    span still matches. Returns (col, row, width, height) tuples in cells.
+    """
+    taken = bytearray(cols * rows)
+    rects = []
+    for r in range(rows):
+        base = r * cols
+        c = 0
+        while c < cols:
+            i = base + c
+            if taken[i] or not flags[i] & mask:
+                c += 1
+                continue
+            w = 1
+            while c + w < cols and not taken[i + w] and flags[i + w] & mask:
+                w += 1
+            h = 1
+            while r + h < rows:
+                below = i + h * cols
+                if all(not taken[j] and flags[j] & mask for j in range(below, below + w)):
+                    h += 1
+                else:
+                    break
+            for y in range(h):
+                start = i + y * cols
+                taken[start:start + w] = b"\1" * w
+            rects.append((c, r, w, h))
+            c += w
+    return rects
+
+class RectIndex:
+    """Merged cell rects on a coarse bucket grid, for "is anything here" queries."""
+
+    def __init__(self, rects, tile_size, bucket=8):
+        self.rects = rects
+        self.tile_size = tile_size
+        self.bucket = bucket
+        # (bucket x, bucket y) -> rects as (col0, row0, col1, row1), ends exclusive
+        self.buckets = {}
+        for c, r, w, h in rects:
+            box = (c, r, c + w, r + h)
+            for by in range(r // bucket, (r + h - 1) // bucket + 1):
+                for bx in range(c // bucket, (c + w - 1) // bucket + 1):
+                    self.buckets.setdefault((bx, by), []).append(box)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def any_in_cells(self, c0, r0, c1, r1):
+        """True if a rect covers any cell of the inclusive range."""
+        b, buckets = self.bucket, self.buckets
+        for by in range(r0 // b, r1 // b + 1):
+            for bx in range(c0 // b, c1 // b + 1):
+                for x0, y0, x1, y1 in buckets.get((bx, by), ()):
+                    if x0 <= c1 and c0 < x1 and y0 <= r1 and r0 < y1:
+                        return True
+        return False
+
+    def overlaps(self, left, top, right, bottom):
+        """True if a rect overlaps the pixel box, by the same edge test the
+        per-tile collision code uses."""
+        ts = self.tile_size
+        c0, c1 = left // ts, right // ts
+        r0, r1 = top // ts, bottom // ts
+        b, buckets = self.bucket, self.buckets
+        for by in range(r0 // b, r1 // b + 1):
+            for bx in range(c0 // b, c1 // b + 1):
+                for x0, y0, x1, y1 in buckets.get((bx, by), ()):
+                    if x0 * ts < right and left < x1 * ts and y0 * ts < bottom and top < y1 * ts:
+                        return True
+        return False
+
+class CollisionGrid:
+    """tile_properties() baked down to one byte of flags per map cell.
+
+    Built once per map so the Player's per-tick queries are integer lookups
+    instead of dict lookups and Rect allocations. Solid and bridge cells are
+    also merged into big rects (see greedy_merge) so "is there anything
+    here at all" is a handful of rect tests, which is the usual answer.
+    """
+    # Masks that get a merged RectIndex, any other mask falls back to the cells
+    MERGED = (SOLID, SOLID | BRIDGE)
+
+    def __init__(self, grid, properties, tile_size, merge_rects=True):
+        self.tile_size = tile_size
+        self.rows = len(grid)
+        self.cols = len(grid[0]) if self.rows else 0
+        self.width_px = self.cols * tile_size
+        self.height_px = self.rows * tile_size
+
+        # Flags per tile ID first, then spread over the map
+        tile_flags = {}
+        tile_damage = {}
+        for tid, props in properties.items():
+            flags = 0
+            if props.get("solid"): flags |= SOLID
+            if props.get("type") == "bridge": flags |= BRIDGE
+            if props.get("type") == "liquid": flags |= LIQUID
+            if props.get("damage", 0) > 0:
+                flags |= DAMAGE
+                tile_damage[tid] = props["damage"]
+            tile_flags[tid] = flags
+
+        self.flags = array('B', bytes(self.rows * self.cols))
+        self.damage = {}  # cell index -> damage, hazards are rare so this stays small
+        i = 0
+        for row in grid:
+            for tid in row:
+                if tid != EMPTY:
+                    self.flags[i] = tile_flags.get(int(tid), 0)
+                    if tid in tile_damage:
+                        self.damage[i] = tile_damage[tid]
+                i += 1
+
+        self.rect_index = {}
+        if merge_rects:
+            for mask in self.MERGED:
+                self.rect_index[mask] = RectIndex(greedy_merge(self.flags, self.cols, self.rows, mask), tile_size)
+
+    def flags_at(self, col, row):
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.flags[row * self.cols + col]
+        return 0
+
+    def damage_at(self, col, row):
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.damage.get(row * self.cols + col, 0)
+        return 0
+
+    def cells_in_rect(self, rect, mask):
+        """Yield (col, row, flags) for cells under rect that have any of the mask bits.
+
+        Like the old per-tile scan this includes the cells the right/bottom edge
+        sits on, so callers still test the actual overlap. Rows come out in order.
+        """
+        ts = self.tile_size
+        c0, c1 = max(0, rect.left // ts), min(self.cols - 1, rect.right // ts)
+        r0, r1 = max(0, rect.top // ts), min(self.rows - 1, rect.bottom // ts)
+        if c0 > c1: return
+        flags, cols = self.flags, self.cols
+        for r in range(r0, r1 + 1):
+            base = r * cols
+            row = flags[base + c0:base + c1 + 1]
+            if not any(row): continue  # most rows under the player are air
+            for c, f in enumerate(row, c0):
+                if f & mask:
+                    yield c, r, f
+
+    def overlaps(self, rect, mask):
+        """True if rect shares any area with a cell that has one of the mask bits.
+
+        When this is False a per-cell pass over cells_in_rect() would skip
+        every cell, so callers can bail out early.
+        """
+        index = self.rect_index.get(mask)
+        # A zero-width box on a seam between two merged cells would hit the
+        # merged rect but neither cell, those go the slow way
+        if index is not None and rect.width and rect.height:
+            return index.overlaps(rect.left, rect.top, rect.right, rect.bottom)
+        ts = self.tile_size
+        for c, r, f in self.cells_in_rect(rect, mask):
+            if rect.left < (c + 1) * ts and c * ts < rect.right and rect.top < (r + 1) * ts and r * ts < rect.bottom:
+                return True
+        return False
+
+    def any_in_cells(self, c0, r0, c1, r1, mask):
+        """True if any cell in the inclusive range has one of the mask bits."""
+        c0, c1 = max(0, c0), min(self.cols - 1, c1)
+        r0, r1 = max(0, r0), min(self.rows - 1, r1)
+        if c0 > c1 or r0 > r1: return False
+        index = self.rect_index.get(mask)
+        if index is not None:
+            return index.any_in_cells(c0, r0, c1, r1)
+        flags, cols = self.flags, self.cols
+        for r in range(r0, r1 + 1):
+            base = r * cols
+            for f in flags[base + c0:base + c1 + 1]:
+                if f & mask:
+                    return True
+        return False
+
+    def sweep_x(self, rect, dx, mask=SOLID):
+        """First mask cell rect runs into moving dx px sideways.
+
+        Returns (t, col, row, flags), t being the fraction of dx travelled
+        at contact, or None if the way is clear. Cells rect already overlaps
+        don't count, those are for the per-tile pass to sort out.
+        """
+        return self._sweep(rect.left, rect.right, rect.top, rect.bottom, dx, mask, False)
+
+    def sweep_y(self, rect, dy, mask=SOLID, one_way=0):
+        """Same as sweep_x going down (dy > 0) or up. one_way cells, the
+        bridges, only stop a rect on its way down. Everything a sweep reports
+        starts below the rect's bottom edge, so it always comes from above.
+        """
+        if dy > 0: mask |= one_way
+        return self._sweep(rect.top, rect.bottom, rect.left, rect.right, dy, mask, True)
+
+    def _sweep(self, lo, hi, side_lo, side_hi, delta, mask, vertical):
+        # Amanatides & Woo along one axis: hop from cell boundary to cell
+        # boundary ahead of the leading edge and check the strip of cells the
+        # rect's cross-section covers. Distances stay in whole pixels instead
+        # of tMax/tDelta fractions so nothing drifts.
+        if not delta: return None
+        ts, cols, flags = self.tile_size, self.cols, self.flags
+        if delta > 0:
+            step, cell = 1, -(-hi // ts)    # first cell the leading edge hasn't entered
+            dist = cell * ts - hi
+        else:
+            step, cell = -1, lo // ts - 1
+            dist = lo - (cell + 1) * ts
+        size = self.rows if vertical else cols
+        s0 = max(0, side_lo // ts)
+        s1 = min((cols if vertical else self.rows) - 1, (side_hi - 1) // ts)
+        if s0 > s1: return None
+        reach = abs(delta)
+
+        while dist < reach:   # touching at the end of the move isn't a hit
+            if 0 <= cell < size:
+                if vertical:
+                    base = cell * cols
+                    for c in range(s0, s1 + 1):
+                        f = flags[base + c]
+                        if f & mask:
+                            return dist / reach, c, cell, f
+                else:
+                    for r in range(s0, s1 + 1):
+                        f = flags[r * cols + cell]
+                        if f & mask:
+                            return dist / reach, cell, r, f
+            elif (cell < 0) == (step < 0):
+                return None   # off the map and heading further out
+            cell += step
+            dist += ts
+        return None
@@ -0,0 +1,51 @@
+"""Pre-rendered fade sequences shared by every temporary effect.
+
+An effect registers a builder once:
+
+    fade_cache.register("summoned_platform", draw_platform)
+
+where draw_platform(size, alpha) returns a Surface. The first get() for a
+size renders the whole sequence (ALPHA_STEPS images from 0 to 255 alpha),
+after that drawing is a dict lookup and a blit for every instance.
+"""
+import pygame
+
+ALPHA_STEPS = 32
+
+_builders = {}   # name -> (builder, steps)
+_sequences = {}  # (name, size) -> [Surface, ...] from transparent to opaque
+
+def register(name, builder, steps=ALPHA_STEPS):
+    """Add or replace a fade sequence. Replacing drops the frames built with the old builder."""
+    _builders[name] = (builder, steps)
+    for key in [k for k in _sequences if k[0] == name]:
+        del _sequences[key]
+
+def sequence(name, size):
+    key = (name, tuple(size))
+    frames = _sequences.get(key)
+    if frames is None:
+        builder, steps = _builders[name]
+        frames = [builder(key[1], round(i * 255 / (steps - 1))) for i in range(steps)]
+        _sequences[key] = frames
+    return frames
+
+def get(name, size, alpha):
+    """The pre-rendered image closest to alpha (0-255)."""
+    frames = sequence(name, size)
+    alpha = min(255, max(0, alpha))
+    return frames[round(alpha * (len(frames) - 1) / 255)]
+
+def clear():
+    _sequences.clear()
+
+def resident_bytes():
+    return sum(s.get_pitch() * s.get_height() for frames in _sequences.values() for s in frames)
+
+def draw_rounded_rect(color, radius):
+    """Builder for a flat rounded rectangle, faded through its color's alpha."""
+    def build(size, alpha):
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(surf, (*color[:3], alpha), surf.get_rect(), border_radius=radius)
+        return surf
+    return build
@@ -0,0 +1,163 @@
+"""Per-phase frame timing in a fixed-size ring buffer.
+
+    prof = FrameProfiler()
+    prof.begin_frame()
+    with prof.phase("player.update"):
+        ...
+    prof.end_frame()
+
+The last `capacity` frames are kept (older ones are overwritten) and can be
+summarised, drawn by ProfilerOverlay or dumped as a Chrome trace
+(chrome://tracing, ui.perfetto.dev). No pygame in here, the headless
+simulation uses it too.
+"""
+import cProfile
+import json
+import time
+from array import array
+
+class _Scope:
+    """Reusable context manager for one phase name, so timing a phase allocates nothing."""
+    __slots__ = ("prof", "index", "t0")
+
+    def __init__(self, prof, index):
+        self.prof = prof
+        self.index = index
+        self.t0 = 0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter_ns()
+        events = self.prof.current
+        if events is not None:
+            events.append(self.index)
+            events.append(self.t0)
+            events.append(t1 - self.t0)
+
+class _NullScope:
+    __slots__ = ()
+    def __enter__(self): pass
+    def __exit__(self, *exc): pass
+
+class NullProfiler:
+    """Stands in when nothing is being measured."""
+    _scope = _NullScope()
+
+    def phase(self, name):
+        return self._scope
+
+NULL_PROFILER = NullProfiler()
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+class FrameProfiler:
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.names = []     # phase names, in the order they were first seen
+        self.scopes = {}
+        self.frame_start = array('q', bytes(8 * capacity))  # perf_counter_ns
+        self.frame_time = array('q', bytes(8 * capacity))   # ns
+        # Flat (phase index, start ns, duration ns) triples per frame, the lists are reused
+        self.events = [[] for _ in range(capacity)]
+        self.count = 0      # frames finished so far
+        self.current = None # events of the frame in progress
+        self.frame_t0 = 0
+
+        # cProfile of the next few frames, see profile_next()
+        self.cprofile = None
+        self.cprofile_frames = 0
+        self.cprofile_path = None
+
+    def phase(self, name):
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = _Scope(self, len(self.names))
+            self.names.append(name)
+        return scope
+
+    def begin_frame(self):
+        if self.cprofile_path and self.cprofile is None:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.current = self.events[self.count % self.capacity]
+        self.current.clear()
+        self.frame_t0 = time.perf_counter_ns()
+
+    def end_frame(self):
+        slot = self.count % self.capacity
+        self.frame_start[slot] = self.frame_t0
+        self.frame_time[slot] = time.perf_counter_ns() - self.frame_t0
+        self.count += 1
+        self.current = None
+        if self.cprofile is not None:
+            self.cprofile_frames -= 1
+            if self.cprofile_frames <= 0:
+                self.cprofile.disable()
+                self.cprofile.dump_stats(self.cprofile_path)
+                print(f"profiler: wrote cProfile stats to {self.cprofile_path}")
+                self.cprofile = self.cprofile_path = None
+
+    def profile_next(self, frames, path):
+        """Run cProfile over the next `frames` frames and dump the stats to path (.prof)."""
+        if self.cprofile_path is None:
+            self.cprofile_frames, self.cprofile_path = frames, path
+
+    # --- Reading it back ---
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def frames(self, last=None):
+        """(start ns, frame ns, events) for the buffered frames, oldest first."""
+        n = len(self)
+        if last is not None:
+            n = min(n, last)
+        for i in range(self.count - n, self.count):
+            slot = i % self.capacity
+            yield self.frame_start[slot], self.frame_time[slot], self.events[slot]
+
+    def frame_times_ms(self, last=None):
+        return [t / 1e6 for _, t, _ in self.frames(last)]
+
+    def summary(self, last=None):
+        """{name: (p50 ms, p99 ms)} for the whole frame and each phase.
+
+        A phase that runs several times in a frame (one per tick) counts
+        as its total for that frame.
+        """
+        frame_ms = []
+        per_phase = [[] for _ in self.names]
+        for _, frame_ns, events in self.frames(last):
+            frame_ms.append(frame_ns / 1e6)
+            totals = {}
+            for j in range(0, len(events), 3):
+                totals[events[j]] = totals.get(events[j], 0) + events[j + 2]
+            for index, ns in totals.items():
+                per_phase[index].append(ns / 1e6)
+        out = {}
+        frame_ms.sort()
+        out["frame"] = (percentile(frame_ms, 0.5), percentile(frame_ms, 0.99))
+        for name, values in zip(self.names, per_phase):
+            values.sort()
+            out[name] = (percentile(values, 0.5), percentile(values, 0.99))
+        return out
+
+    def export_chrome_trace(self, path, last=None):
+        """Write the buffered frames as Chrome trace events, returns how many frames went out."""
+        events = []
+        frames = list(self.frames(last))
+        origin = frames[0][0] if frames else 0
+        for number, (start, frame_ns, phases) in enumerate(frames, self.count - len(frames)):
+            events.append({"name": "frame", "ph": "X", "pid": 0, "tid": 0,
+                           "ts": (start - origin) / 1e3, "dur": frame_ns / 1e3, "args": {"frame": number}})
+            for j in range(0, len(phases), 3):
+                events.append({"name": self.names[phases[j]], "ph": "X", "pid": 0, "tid": 0,
+                               "ts": (phases[j + 1] - origin) / 1e3, "dur": phases[j + 2] / 1e3})
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(frames)
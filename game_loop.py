@@ -0,0 +1,38 @@
+class FixedTimestep:
+    """Turns real elapsed time into a whole number of fixed simulation ticks.
+
+    Every physics constant in the game is "per tick", so the simulation always
+    advances in steps of 1/tick_rate seconds no matter how fast frames render.
+    Leftover time carries over to the next frame and `alpha` says how far the
+    renderer is between the previous tick and the current one.
+    """
+    def __init__(self, tick_rate=60, max_ticks_per_frame=5):
+        self.tick_rate = tick_rate
+        self.dt_ms = 1000 / tick_rate
+        # After a long stall drop the backlog instead of spiralling
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.dropped_ticks = 0
+
+    @property
+    def now(self):
+        """Simulation time in whole milliseconds, a stand-in for pygame.time.get_ticks()."""
+        return int(self.ticks * 1000 // self.tick_rate)
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.dt_ms
+
+    def advance(self, elapsed_ms):
+        """Add real time, returns how many ticks to run this frame."""
+        self.accumulator += elapsed_ms
+        count = int(self.accumulator // self.dt_ms)
+        self.accumulator -= count * self.dt_ms
+        if count > self.max_ticks_per_frame:
+            self.dropped_ticks += count - self.max_ticks_per_frame
+            count = self.max_ticks_per_frame
+        return count
+
+    def tick(self):
+        self.ticks += 1
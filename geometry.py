@@ -0,0 +1,152 @@
+"""Plain-Python stand-ins for the bits of pygame.Rect and pygame.Vector2 the
+simulation uses, so physics runs without pygame.
+
+They follow pygame's rules (integer rects, w // 2 centres, the same float
+math for vectors) so a body gives the same trajectory either way: Rect()
+and update() truncate floats towards zero, the edge, centre and size
+setters round them half away from zero. x, y, w and h are plain slots,
+only ever assign them ints. benchmarks/bench_geometry checks all of this
+against pygame.
+"""
+import math
+
+def _round(v):
+    # pygame's rounding, round() would take 12.5 to 12
+    if type(v) is int:
+        return v
+    return math.floor(v + 0.5) if v >= 0 else -math.floor(0.5 - v)
+
+class Rect:
+    __slots__ = ("x", "y", "w", "h")
+
+    def __init__(self, x, y, w, h):
+        self.x, self.y, self.w, self.h = int(x), int(y), int(w), int(h)
+
+    def __repr__(self):
+        return f"<Rect({self.x}, {self.y}, {self.w}, {self.h})>"
+
+    # A 4-item sequence, so pygame accepts it wherever it takes a rect
+    def __iter__(self):
+        return iter((self.x, self.y, self.w, self.h))
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.w, self.h)[i]
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def copy(self):
+        return Rect(self.x, self.y, self.w, self.h)
+
+    def update(self, x, y, w, h):
+        self.x, self.y, self.w, self.h = int(x), int(y), int(w), int(h)
+
+    def colliderect(self, other):
+        return bool(self.w and self.h and other.w and other.h and
+                    self.x < other.x + other.w and other.x < self.x + self.w and
+                    self.y < other.y + other.h and other.y < self.y + self.h)
+
+    # Edges
+    @property
+    def left(self): return self.x
+    @left.setter
+    def left(self, v): self.x = _round(v)
+
+    @property
+    def top(self): return self.y
+    @top.setter
+    def top(self, v): self.y = _round(v)
+
+    @property
+    def right(self): return self.x + self.w
+    @right.setter
+    def right(self, v): self.x = _round(v) - self.w
+
+    @property
+    def bottom(self): return self.y + self.h
+    @bottom.setter
+    def bottom(self, v): self.y = _round(v) - self.h
+
+    @property
+    def width(self): return self.w
+    @width.setter
+    def width(self, v): self.w = _round(v)
+
+    @property
+    def height(self): return self.h
+    @height.setter
+    def height(self, v): self.h = _round(v)
+
+    # Centres
+    @property
+    def centerx(self): return self.x + self.w // 2
+    @centerx.setter
+    def centerx(self, v): self.x = _round(v) - self.w // 2
+
+    @property
+    def centery(self): return self.y + self.h // 2
+    @centery.setter
+    def centery(self, v): self.y = _round(v) - self.h // 2
+
+    # Pairs
+    @property
+    def topleft(self): return (self.x, self.y)
+    @topleft.setter
+    def topleft(self, v): self.x, self.y = _round(v[0]), _round(v[1])
+
+    @property
+    def size(self): return (self.w, self.h)
+    @size.setter
+    def size(self, v): self.w, self.h = _round(v[0]), _round(v[1])
+
+    @property
+    def center(self): return (self.centerx, self.centery)
+    @center.setter
+    def center(self, v): self.centerx, self.centery = v
+
+    @property
+    def midbottom(self): return (self.centerx, self.bottom)
+    @midbottom.setter
+    def midbottom(self, v): self.centerx, self.bottom = v
+
+class Vec2:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x=0.0, y=None):
+        if y is None:
+            x, y = x
+        self.x, self.y = float(x), float(y)
+
+    def __repr__(self):
+        return f"<Vec2({self.x}, {self.y})>"
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __add__(self, other):
+        return Vec2(self.x + other[0], self.y + other[1])
+
+    def __sub__(self, other):
+        return Vec2(self.x - other[0], self.y - other[1])
+
+    def __getitem__(self, i):
+        return (self.x, self.y)[i]
+
+    def update(self, x, y=None):
+        if y is None:
+            x, y = x
+        self.x, self.y = float(x), float(y)
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def scale_to_length(self, length):
+        fraction = length / self.length()
+        self.x *= fraction
+        self.y *= fraction
@@ -0,0 +1,69 @@
+class Ghost:
+    __slots__ = ("x", "y", "frame", "facing_right", "alpha")
+
+    def __init__(self):
+        self.x = self.y = 0
+        self.frame = None
+        self.facing_right = True
+        self.alpha = 0
+
+class GhostTrail:
+    """Dash afterimages in a fixed ring of preallocated Ghost records.
+
+    Ghosts only point at the animation frame they came from. Every ghost
+    starts at start_alpha and loses `fade` per fade() call, so the oldest
+    one always expires first and the ring never has holes. When the ring is
+    full a new ghost replaces the oldest.
+    """
+    def __init__(self, capacity=16, start_alpha=150, fade=12):
+        if capacity < 0:
+            raise ValueError(f"ghost trail capacity must be 0 or more, got {capacity}")
+        self.slots = [Ghost() for _ in range(capacity)]
+        self.capacity = capacity
+        self.start_alpha = start_alpha
+        self.fade_rate = fade
+        self.tail = 0   # oldest live ghost
+        self.size = 0
+        self._blits = []
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """Live ghosts, oldest first."""
+        for i in range(self.size):
+            yield self.slots[(self.tail + i) % self.capacity]
+
+    def push(self, x, y, frame, facing_right):
+        if not self.capacity:
+            return   # capacity 0 turns the trail off
+        if self.size == self.capacity:
+            self.tail = (self.tail + 1) % self.capacity
+            self.size -= 1
+        g = self.slots[(self.tail + self.size) % self.capacity]
+        g.x, g.y, g.frame, g.facing_right, g.alpha = x, y, frame, facing_right, self.start_alpha
+        self.size += 1
+
+    def fade(self):
+        for g in self:
+            g.alpha -= self.fade_rate
+        while self.size and self.slots[self.tail].alpha <= 0:
+            self.slots[self.tail].frame = None
+            self.tail = (self.tail + 1) % self.capacity
+            self.size -= 1
+
+    def clear(self):
+        for g in self:
+            g.frame = None
+        self.tail = self.size = 0
+
+    def draw(self, screen, camera_x, camera_y, image_for, render_scale=1):
+        """Blit every ghost in one call, image_for(frame, facing_right, alpha) picks the Surface."""
+        if not self.size:
+            return
+        blits = self._blits
+        blits.clear()
+        for g in self:
+            blits.append((image_for(g.frame, g.facing_right, g.alpha),
+                          (int((g.x - camera_x) * render_scale), int((g.y - camera_y) * render_scale))))
+        screen.blits(blits, doreturn=False)
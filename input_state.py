@@ -0,0 +1,76 @@
+"""Player input as one immutable snapshot per simulation tick.
+
+Gameplay code only sees action bits (LEFT, JUMP, ...), never keys, so input
+can be rebound, recorded, or made up entirely in tests and benchmarks.
+"""
+from typing import NamedTuple
+
+# Actions, one bit each
+LEFT = 1 << 0
+RIGHT = 1 << 1
+JUMP = 1 << 2
+DOWN = 1 << 3     # summon a platform / drop through bridges
+SLIDE = 1 << 4
+
+ACTIONS = {"left": LEFT, "right": RIGHT, "jump": JUMP, "down": DOWN, "slide": SLIDE}
+
+class InputSnapshot(NamedTuple):
+    pressed: int = 0        # actions held this tick
+    just_pressed: int = 0   # held now, not last tick
+    just_released: int = 0  # held last tick, not now
+
+    def held(self, action):
+        return bool(self.pressed & action)
+
+    def tapped(self, action):
+        return bool(self.just_pressed & action)
+
+    def released(self, action):
+        return bool(self.just_released & action)
+
+    def next(self, pressed):
+        """The snapshot for the following tick, given what is held then."""
+        return InputSnapshot(pressed, pressed & ~self.pressed, self.pressed & ~pressed)
+
+NO_INPUT = InputSnapshot()
+
+def default_bindings():
+    import pygame
+    return {
+        LEFT: [pygame.K_a],
+        RIGHT: [pygame.K_d],
+        JUMP: [pygame.K_w],
+        DOWN: [pygame.K_s],
+        SLIDE: [pygame.K_LSHIFT],
+    }
+
+class InputMapper:
+    """Reads the keyboard once per tick and turns it into an InputSnapshot."""
+
+    def __init__(self, bindings=None):
+        self.bindings = default_bindings() if bindings is None else {a: list(k) for a, k in bindings.items()}
+        self.last = NO_INPUT
+
+    def bind(self, action, *keys):
+        """Replace the keys for an action."""
+        self.bindings[action] = list(keys)
+
+    def pressed_mask(self, keys):
+        mask = 0
+        for action, codes in self.bindings.items():
+            for code in codes:
+                if keys[code]:
+                    mask |= action
+                    break
+        return mask
+
+    def poll(self, keys=None):
+        """Advance to the next tick. keys defaults to pygame.key.get_pressed()."""
+        if keys is None:
+            import pygame
+            keys = pygame.key.get_pressed()
+        self.last = self.last.next(self.pressed_mask(keys))
+        return self.last
+
+    def reset(self):
+        self.last = NO_INPUT
@@ -1,87 +1,70 @@
 import pygame
 from maploader import Maploader
 from spritesheet import SpriteSheet
+from tile_library import TileLibrary
+from chunk_cache import ChunkCache
+from collision import CollisionGrid, tile_properties
 
 class Mapdraw:
-    def __init__(self, spritesheet_path, mapfile, colorkey, tilesize, scale):
-        self.spritesheet = SpriteSheet(spritesheet_path)
+    def __init__(self, spritesheet_path, mapfile, colorkey, tilesize, scale, max_tiles=512, chunk_size=8, max_chunks=64, render_scale=1, assets=None):
+        self.spritesheet = SpriteSheet(spritesheet_path, assets=assets)
         self.loader = Maploader(mapfile)
-        self.grid = self.loader.load()
+        # .tmx maps can have several tile layers, the first one is the one you collide with
+        self.layers = self.loader.load_layers()
+        self.grid = self.layers[0]
         self.tile_size = tilesize * scale
         self.scale = scale
+        # World pixels (camera, collision) use tile_size, tiles are drawn at draw_tile_size.
+        # render_scale = 1/scale draws the sheet 1:1 into a low-res target.
+        self.render_scale = render_scale
+        self.draw_scale = scale * render_scale
+        self.draw_tile_size = int(tilesize * self.draw_scale)
         self.colorkey = colorkey
+        self.max_tiles = max_tiles
         # Your sheet is 1600x1600, tiles are 16x16 -> 100 columns
-        self.sheet_cols = self.spritesheet.sheet.get_width() // tilesize
+        self.sheet_cols = self.spritesheet.get_size()[0] // tilesize
 
-        # Automatically cut the spritesheet into a library
+        # Example: Tile 13 is the start of a 4-frame water animation
+        self.animations = {
+            ### : [i for i in range( ### , ### +1)],
+            13 : [i for i in range( 13 , 16 +1)],
+            113 : [i for i in range( 113 , 116 +1)],
+            500: [i for i in range(500,505)]            # Flickering spike
+        }
+
+        # Tiles are cut from the sheet on demand, only the ones the map uses are built now
         self.tile_images = self.generate_tile_library(tilesize)
 
+        # Static tiles get baked into chunk surfaces per layer, see draw()
+        self.layer_chunks = [ChunkCache(layer, self.tile_images, self.animations,
+                                        self.draw_tile_size, chunk_size, max_chunks, colorkey=self.colorkey)
+                             for layer in self.layers]
+
         self.anim_frame = 0
         self.last_update = pygame.time.get_ticks()
         self.anim_speed = 200 # Milliseconds per frame
     def generate_tile_library(self, tilesize):
-        library = {}
-        sheet_w = self.spritesheet.sheet.get_width()
-        sheet_h = self.spritesheet.sheet.get_height()
-        cols = sheet_w // tilesize
-        rows = sheet_h // tilesize
-        
-        # FIX: Tiled IDs start at 0, not 1
-        tile_count = 0 
-        for y in range(rows):
-            for x in range(cols):
-                img = self.spritesheet.get_image(
-                    x * tilesize, y * tilesize, 
-                    tilesize, tilesize, 0, self.scale, self.colorkey
-                )
-                library[tile_count] = img
-                tile_count += 1
+        library = TileLibrary(self.spritesheet, tilesize, self.draw_scale, self.colorkey, self.max_tiles)
+
+        used = set()
+        for layer in self.layers:
+            used.update(layer.unique_ids())
+        for frames in self.animations.values():
+            used.update(frames)
+        library.warm(sorted(used))
         return library
 
     def tile_properties(self):
         """Define physics based on Tiled ID ranges."""
-        props = {}
-        unique_ids = {tile for row in self.grid for tile in row if tile is not None}
-        
-        # Define lists once outside the loop
-        water_tiles = [213, 13,113, 307, 312]
-        decoration_tiles = [107, 207, 112, 212]
-        bridge_tiles = [7, 8, 9, 10, 11, 12]
-        hazard_tiles = [500]
-        # In Mapdraw.tile_properties
-        # Example: Tile 205 is the start of a 4-frame water animation
-        self.animations = {
-            ### : [i for i in range( ### , ### +1)],
-            13 : [i for i in range( 13 , 16 +1)],
-            113 : [i for i in range( 113 , 116 +1)],
-            500: [i for i in range(500,505)]            # Flickering spike
-        }
-        for tid in unique_ids:
-            # 1. Start with the broad "Solid" rule for rows 1-6
-            if 0 <= tid <= 599:
-                props[tid] = {"solid": True, "type": "ground"}
-            else:
-                props[tid] = {"solid": False, "type": "decoration"}
-            
-            # 2. Refine with specific overrides (Order matters!)
-            if tid in water_tiles:
-                props[tid] = {"solid": False, "type": "liquid"}
-            
-            elif tid in bridge_tiles:
-                # Note: Bridges are usually solid:False so you can jump THROUGH them, 
-                # but we'll handle the 'standing on top' logic in Player.py
-                props[tid] = {"solid": False, "type": "bridge"}
-            
-            elif tid in decoration_tiles:
-                props[tid] = {"solid": False, "type": "decoration"}
-            
-            # 3. Hazards (Set damage)
-            if tid in hazard_tiles:
-                props[tid]["damage"] = 1
-                # Usually, spikes aren't "solid" so you can fall into them
-                props[tid]["solid"] = False
+        return tile_properties(self.grid.unique_ids())
+
+    def compile_collision(self, properties=None):
+        """Bake tile_properties() into a per-cell flag grid for the Player."""
+        if properties is None:
+            properties = self.tile_properties()
+        self.collision = CollisionGrid(self.grid, properties, self.tile_size)
+        return self.collision
 
-        return props
     def update_animation(self):
         now = pygame.time.get_ticks()
         if now - self.last_update > self.anim_speed:
@@ -92,26 +75,29 @@ class Mapdraw:
         self.update_animation() 
 
         sw, sh = surface.get_size()
-        start_col = max(0, int(camera_x // self.tile_size))
-        start_row = max(0, int(camera_y // self.tile_size))
-        end_col = min(len(self.grid[0]), int((camera_x + sw) // self.tile_size + 1))
-        end_row = min(len(self.grid), int((camera_y + sh) // self.tile_size + 1))
+        for layer, chunks in zip(self.layers, self.layer_chunks):
+            # Camera is in world pixels, Tiled layer offsets in sheet pixels
+            cam_x = int(camera_x * self.render_scale) - layer.offset[0] * self.draw_scale
+            cam_y = int(camera_y * self.render_scale) - layer.offset[1] * self.draw_scale
+            self.draw_layer(surface, chunks, cam_x, cam_y, sw, sh)
+
+    def draw_layer(self, surface, chunks, camera_x, camera_y, sw, sh):
+        visible = chunks.visible(camera_x, camera_y, sw, sh)
+        chunk_px = chunks.chunk_px
 
-        for row in range(start_row, end_row):
-            for col in range(start_col, end_col):
-                tid = self.grid[row][col]
-                if tid is not None:
-                    # Now this will find the entry in self.animations
-                    if tid in self.animations:
-                        frames = self.animations[tid]
-                        actual_tid = frames[self.anim_frame % len(frames)]
-                    else:
-                        actual_tid = tid
+        # One blit per chunk for everything that never changes
+        surface.blits([(chunk.surface, (int(cx * chunk_px - camera_x), int(cy * chunk_px - camera_y)))
+                       for cx, cy, chunk in visible if chunk.surface is not None], doreturn=False)
 
+        # Animated tiles go on top, skipping the ones outside the screen
+        ts = chunks.tile_size
+        for _, _, chunk in visible:
+            for x, y, frames in chunk.animated:
+                sx, sy = int(x - camera_x), int(y - camera_y)
+                if -ts < sx < sw and -ts < sy < sh:
+                    actual_tid = frames[self.anim_frame % len(frames)]
                     if actual_tid in self.tile_images:
-                        surface.blit(self.tile_images[actual_tid], 
-                                    (int(col * self.tile_size - camera_x), 
-                                     int(row * self.tile_size - camera_y)))
+                        surface.blit(self.tile_images[actual_tid], (sx, sy))
 
     def map_size(self):
         if not self.grid: return 0, 0
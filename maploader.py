@@ -1,31 +1,240 @@
-import pygame
+import base64
+import gzip
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+import xml.etree.ElementTree as ET
+from array import array
+from tile_grid import TileGrid, compact
+
+# Compiled map layout (little-endian):
+#   header, then one LAYER entry per layer, then each layer's raw cells
+#   starting on an 8 byte boundary. Cells are int16 or int32, -1 = EMPTY.
+MAGIC = b"PCMAP\0\0\0"
+VERSION = 2
+HEADER = struct.Struct("<8sHHQQ20s")    # magic, version, layer count, source mtime_ns, source size, source sha1
+LAYER = struct.Struct("<32sB3xIIiiQ")   # name, bytes per cell, cols, rows, offset x, offset y, data offset
+CACHE_SUFFIX = ".pcmap"
+
+# Tiled stores flip/rotate flags in the top four bits of every GID (the
+# fourth, hex rotation, since Tiled 1.9), we don't draw those
+GID_MASK = 0x0FFFFFFF
 
 class Maploader:
-    def __init__(self, file_name):
+    def __init__(self, file_name, use_cache=True):
         self.file_name = file_name
+        # Parsed maps get compiled next to the source and memory-mapped on later loads
+        self.use_cache = use_cache
+        self.cache_path = file_name + CACHE_SUFFIX
 
     def load(self):
-        tile_grid = []
+        """The first tile layer of the map as a TileGrid."""
+        return self.load_layers()[0]
+
+    def load_layers(self):
         try:
-            with open(self.file_name, 'r') as f:
-                for line in f:
-                    # 1. Clean up whitespace and handle trailing commas
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # 2. Split by comma and convert
-                    # We convert '-1' to None so Mapdraw knows not to draw anything there.
-                    row = []
-                    for tile in line.split(','):
-                        if tile.strip():
-                            val = int(tile)
-                            row.append(val if val != -1 else None)
-                    
-                    tile_grid.append(row)
+            if self.use_cache:
+                return self._load_cached()
+            return self.parse()
         except FileNotFoundError:
             print(f"Error: {self.file_name} not found.")
             # Return a small dummy grid so the game doesn't crash immediately
-            return [[None]]
-            
-        return tile_grid
\ No newline at end of file
+            return [TileGrid(1, 1)]
+
+    def parse(self):
+        """Read the source map, returns a list of TileGrids."""
+        if self.file_name.lower().endswith('.tmx'):
+            return self._parse_tmx()
+        return [self._parse_csv()]
+
+    def _parse_csv(self):
+        # All cells go into one flat int array, -1 (EMPTY) marks "draw nothing here"
+        cells = array('i')
+        cols = rows = 0
+        with open(self.file_name, 'r') as f:
+            for line in f:
+                # 1. Clean up whitespace and handle trailing commas
+                line = line.strip().rstrip(',')
+                if not line:
+                    continue
+
+                # 2. Split by comma and convert
+                try:
+                    row = array('i', map(int, line.split(',')))
+                except ValueError:
+                    row = array('i', [int(tile) for tile in line.split(',') if tile.strip()])
+                if rows == 0:
+                    cols = len(row)
+                elif len(row) != cols:
+                    # Ragged export, fall back to padding every row
+                    return self._parse_ragged()
+                cells.extend(row)
+                rows += 1
+        return TileGrid(cols, rows, compact(cells))
+
+    def _parse_ragged(self):
+        with open(self.file_name, 'r') as f:
+            return TileGrid.from_rows([[int(tile) for tile in line.split(',') if tile.strip()]
+                                       for line in f if line.strip()])
+
+    def _parse_tmx(self):
+        """Every tile layer of a Tiled .tmx file, in draw order.
+
+        The XML is streamed so only the layer being decoded is ever in memory.
+        GIDs are shifted by the tileset's firstgid so IDs match the CSV
+        export (0-based, -1 for empty). Mapdraw draws from one sheet, so maps
+        with more than one tileset are refused.
+        """
+        layers = []
+        firstgid = None
+        root = None
+        for event, elem in ET.iterparse(self.file_name, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                    if elem.get('infinite') == '1':
+                        raise ValueError(f"{self.file_name}: infinite (chunked) maps are not supported")
+                elif elem.tag == 'tileset':
+                    if firstgid is not None:
+                        raise ValueError(f"{self.file_name}: more than one tileset, only one is supported")
+                    firstgid = int(elem.get('firstgid', 1))
+                continue
+
+            if elem.tag == 'layer':
+                data = elem.find('data')
+                cols, rows = int(elem.get('width')), int(elem.get('height'))
+                gids = decode_tmx_data(data.text or "", data.get('encoding'), data.get('compression'))
+                if len(gids) != cols * rows:
+                    raise ValueError(f"{self.file_name}: layer {elem.get('name')!r} has {len(gids)} cells, expected {cols * rows}")
+                cells = gids_to_ids(gids, 1 if firstgid is None else firstgid)
+                offset = (int(float(elem.get('offsetx', 0))), int(float(elem.get('offsety', 0))))
+                layers.append(TileGrid(cols, rows, compact(cells), name=elem.get('name', ""), offset=offset))
+                # Drop the decoded layer's XML right away
+                elem.clear()
+                root.clear()
+            elif elem.tag in ('objectgroup', 'imagelayer'):
+                elem.clear()
+
+        if not layers:
+            raise ValueError(f"{self.file_name}: no tile layers")
+        return layers
+
+    # --- Compiled binary maps ---
+
+    def compile(self, layers=None):
+        """Write the compiled map to cache_path, parsing the source if no layers are given."""
+        if layers is None:
+            layers = self.parse()
+        st = os.stat(self.file_name)
+        header = HEADER.pack(MAGIC, VERSION, len(layers), st.st_mtime_ns, st.st_size, source_hash(self.file_name))
+
+        table, blobs = [], []
+        offset = align(HEADER.size + LAYER.size * len(layers))
+        for i, grid in enumerate(layers):
+            itemsize = grid.view.itemsize
+            if sys.byteorder == 'little':
+                data = grid.view.tobytes()
+            else:
+                swapped = array('h' if itemsize == 2 else 'i', grid.view.tobytes())
+                swapped.byteswap()
+                data = swapped.tobytes()
+            name = grid.name or f"layer{i}"
+            ox, oy = grid.offset
+            table.append(LAYER.pack(name.encode()[:32], itemsize, grid.cols, grid.rows, ox, oy, offset))
+            blobs.append((offset, data))
+            offset = align(offset + len(blobs[-1][1]))
+
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(b"".join(table))
+            for start, blob in blobs:
+                f.write(b"\0" * (start - f.tell()))
+                f.write(blob)
+        os.replace(tmp_path, self.cache_path)
+        return layers
+
+    def _load_cached(self):
+        st = os.stat(self.file_name)
+        try:
+            with open(self.cache_path, 'rb') as f:
+                magic, version, count, mtime_ns, size, digest = HEADER.unpack(f.read(HEADER.size))
+                if magic == MAGIC and version == VERSION and size == st.st_size:
+                    if mtime_ns != st.st_mtime_ns:
+                        # Touched but maybe not edited (checkouts, copies), the hash decides
+                        if digest != source_hash(self.file_name):
+                            raise LookupError("stale")
+                        self._refresh_mtime(count, st, digest)
+                    return self._map_layers(f, count)
+        except (OSError, LookupError, ValueError, TypeError, struct.error):
+            # Missing, stale, truncated or from another version: rebuild it
+            pass
+
+        layers = self.parse()
+        try:
+            self.compile(layers)
+        except OSError as e:
+            print(f"Warning: could not write {self.cache_path}: {e}")
+        return layers
+
+    def _refresh_mtime(self, count, st, digest):
+        try:
+            with open(self.cache_path, 'r+b') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, count, st.st_mtime_ns, st.st_size, digest))
+        except OSError:
+            pass
+
+    def _map_layers(self, f, count):
+        table = [LAYER.unpack(f.read(LAYER.size)) for _ in range(count)]
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        layers = []
+        for name, itemsize, cols, rows, ox, oy, offset in table:
+            typecode = 'h' if itemsize == 2 else 'i'
+            raw = memoryview(mm)[offset:offset + cols * rows * itemsize]
+            if sys.byteorder == 'little':
+                cells = raw.cast(typecode)
+            else:
+                cells = array(typecode, raw)
+                cells.byteswap()
+            layers.append(TileGrid(cols, rows, cells, name=name.rstrip(b"\0").decode(), offset=(ox, oy)))
+        return layers
+
+def decode_tmx_data(text, encoding, compression):
+    """A layer's <data> payload as an array of raw GIDs."""
+    if encoding == 'csv':
+        return array('I', map(int, text.replace('\n', '').strip().rstrip(',').split(',')))
+    if encoding != 'base64':
+        # Plain <tile gid=".."/> children are deprecated in Tiled, re-save as CSV or base64
+        raise ValueError(f"unsupported TMX layer encoding: {encoding!r}")
+
+    raw = base64.b64decode(text.strip())
+    if compression == 'zlib':
+        raw = zlib.decompress(raw)
+    elif compression == 'gzip':
+        raw = gzip.decompress(raw)
+    elif compression:
+        raise ValueError(f"unsupported TMX layer compression: {compression!r}")
+    gids = array('I')
+    gids.frombytes(raw)
+    if sys.byteorder != 'little':
+        gids.byteswap()
+    return gids
+
+def gids_to_ids(gids, firstgid):
+    if firstgid == 1 and (not gids or max(gids) <= GID_MASK):
+        # Common case: GID 0 (empty) lands on -1 by itself
+        return array('i', map((-1).__add__, gids))
+    return array('i', [(g & GID_MASK) - firstgid if g & GID_MASK else -1 for g in gids])
+
+def source_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+
+def align(n, to=8):
+    return (n + to - 1) // to * to
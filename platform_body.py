@@ -0,0 +1,82 @@
+"""Platform physics without any drawing, see player_platform.py and
+moving_platform.py for the sprites built on top."""
+from geometry import Rect, Vec2
+
+class SummonedPlatformBody:
+    def __init__(self, x, y, width=64, height=16, now=0):
+        self.rect = Rect(x, y, width, height)
+        self.spawn_time = now
+        self.lifetime = 500  # 0.5 seconds
+        self.alpha = 255     # For a fade-out effect
+
+    def update(self, now):
+        progress = (now - self.spawn_time) / self.lifetime
+        self.alpha = max(0, 255 - int(progress * 255))
+        return now - self.spawn_time < self.lifetime
+
+class MovingPlatformBody:
+    """Goes back and forth between pos_a and pos_b, pausing at each end.
+
+    size is the rect in world pixels.
+    """
+    def __init__(self, pos_a, pos_b, speed, size):
+        self.rect = Rect(0, 0, *size)
+
+        # Positions
+        self.start_pos = Vec2(pos_a)
+        self.end_pos = Vec2(pos_b)
+        self.pos = Vec2(pos_a)
+        self.rect.topleft = (round(self.pos.x), round(self.pos.y))
+        self.prev_pos = Vec2(self.rect.topleft)  # rect position last tick, for drawing
+
+        # Movement logic
+        self.direction = 1
+        self.speed_val = speed
+        self.velocity = Vec2(0, 0)
+
+        # --- Pause Logic ---
+        self.waiting = False
+        self.wait_timer = 0
+        self.wait_duration = 1000  # 1000 milliseconds = 1 second
+
+    def update(self, now):
+        old_pos = Vec2(self.pos)
+        self.prev_pos.update(self.rect.topleft)
+
+        # 1. Handle Waiting State
+        if self.waiting:
+            self.velocity = Vec2(0, 0) # Platform is still
+            if now - self.wait_timer >= self.wait_duration:
+                self.waiting = False
+            return # Skip movement logic while waiting
+
+        # 2. Determine target based on direction
+        target = self.end_pos if self.direction == 1 else self.start_pos
+
+        # 3. Calculate distance to target
+        move_vec = target - self.pos
+        distance = move_vec.length()
+
+        # 4. Move or Trigger Wait
+        if distance > self.speed_val:
+            if distance > 0:
+                move_vec.scale_to_length(self.speed_val)
+                self.pos += move_vec
+        else:
+            # Target reached: Snap to target, flip direction, and start wait timer
+            self.pos = Vec2(target)
+            self.direction *= -1
+            self.waiting = True
+            self.wait_timer = now
+
+        # 5. Set velocity (Crucial for the Player class to stay attached!)
+        self.velocity = self.pos - old_pos
+
+        # 6. Update Rect
+        self.rect.x = round(self.pos.x)
+        self.rect.y = round(self.pos.y)
+
+        self.animate()
+
+    def animate(self):
+        """Called after every moving tick, the sprite subclass advances its frames here."""
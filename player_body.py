@@ -0,0 +1,385 @@
+from geometry import Rect
+from platform_body import SummonedPlatformBody
+from collision import SOLID, BRIDGE, LIQUID, DAMAGE
+from input_state import NO_INPUT, LEFT, RIGHT, JUMP, DOWN, SLIDE
+
+class PlayerBody:
+    """Player movement and collision with no pygame in sight.
+
+    Time only comes in through update(now=...) and input only as
+    InputSnapshots, so the same inputs always give the same trajectory.
+    Player adds the sprites on top.
+    """
+    platform_class = SummonedPlatformBody
+
+    def __init__(self, x, y):
+        # --- Hitboxes ---
+        self.width_standing, self.height_standing = 32, 80
+        self.width_sliding, self.height_sliding = 48, 36
+        
+        # --- Physics ---
+        self.pos_x, self.pos_y = float(x), float(y)
+        self.vel_x, self.vel_y = 0, 0
+        self.hitbox = Rect(int(self.pos_x), int(self.pos_y), self.width_standing, self.height_standing)
+        self.respawn_point = (float(x), float(y))
+        # Where the sprite was anchored last tick, draw() interpolates from here
+        self.prev_centerx, self.prev_bottom = self.hitbox.centerx, self.hitbox.bottom
+
+        # --- Constants ---
+        self.speed, self.accel, self.friction = 7, 0.8, 0.86
+        self.gravity, self.water_gravity = 0.8, 0.25
+        self.jump_power = -15
+        self.dash_speed = 32   
+        self.max_vel_x = 28    
+        
+        # --- Health System ---
+        self.max_hearts, self.current_hearts = 5, 5
+        self.invincible, self.invincibility_timer = False, 0
+        self.invincibility_duration = 1200 
+        
+        # --- State ---
+        self.on_ground = False
+        self.on_solid_ground = False 
+        self.is_sliding = False
+        self.is_dashing = False
+        self.in_water = False
+        self.facing_right = True
+        
+        # --- Platform & Jump System ---
+        self.jumps_left = 2 
+        self.has_platform_charge = True 
+        self.active_platform = None
+        
+        # --- Timers ---
+        self.current_time = 0
+        self.dash_timer = 0
+        self.dash_duration, self.dash_cooldown = 180, 600
+        self.last_dash_time = 0
+        self.coyote_timer, self.jump_buffer_timer = 0, 0
+        self.last_jump_time = 0 
+        self.last_a_time, self.last_d_time = 0, 0
+        self.double_tap_threshold = 250
+
+        # --- Animation State ---
+        # state also picks the hitbox size, so it belongs with the physics
+        self.state, self.frame_index = "idle", 0
+
+        # --- Input ---
+        self.inputs = NO_INPUT
+        self.drop_through = False   # holding down falls through bridges
+
+    def update(self, collision, SH, moving_platforms=(), now=0, inputs=NO_INPUT):
+        """One fixed tick. now is the simulation clock in ms, inputs an InputSnapshot."""
+        self.current_time = now
+        self.prev_centerx, self.prev_bottom = self.hitbox.centerx, self.hitbox.bottom
+        self.inputs = inputs
+        self.drop_through = inputs.held(DOWN)
+        
+        # 1. Update active magic platform
+        if self.active_platform:
+            if not self.active_platform.update(self.current_time): self.active_platform = None
+
+        # 2. Status timers
+        if self.invincible and self.current_time - self.invincibility_timer > self.invincibility_duration:
+            self.invincible = False
+
+        self.check_liquid(collision)
+        self.check_hazards(collision)
+
+        if inputs.tapped(JUMP):
+            self.jump_buffer_timer = self.current_time
+
+        # 3. Horizontal Movement
+        move_dir = inputs.held(RIGHT) - inputs.held(LEFT)
+        self.handle_horizontal_inputs(inputs, move_dir)
+        
+        if self.is_dashing:
+            self.vel_x = self.dash_speed * (1 if self.facing_right else -1)
+            self.vel_y = 0
+            if self.current_time - self.dash_timer > self.dash_duration:
+                self.is_dashing = False
+            self.create_ghost()
+        elif self.is_sliding:
+            self.vel_x *= 0.985 
+            if self.is_ceiling_above(collision):
+                if abs(self.vel_x) < 4.0: self.vel_x = 4.0 if self.facing_right else -4.0
+            else:
+                if not inputs.held(SLIDE) or abs(self.vel_x) < 1.5: self.is_sliding = False
+        else:
+            target_vel = move_dir * (self.speed * 0.5 if self.in_water else self.speed)
+            if move_dir != 0:
+                accel_rate = self.accel if self.on_ground else self.accel * 0.4
+                self.vel_x += (target_vel - self.vel_x) * accel_rate
+            else:
+                self.vel_x *= self.friction if self.on_ground else 0.7
+            if abs(self.vel_x) < 0.1: self.vel_x = 0
+
+        if abs(self.vel_x) > self.max_vel_x:
+            self.vel_x = self.max_vel_x if self.vel_x > 0 else -self.max_vel_x
+
+        # Apply Horizontal Position
+        start_x = self.hitbox.x
+        self.pos_x += self.vel_x
+        self.hitbox.x = round(self.pos_x)
+        self.check_collisions(collision, 'x', start_x)
+
+        # 4. Vertical Movement
+        self.handle_platform_placement(inputs)
+
+        if not self.is_dashing:
+            self.vel_y += self.water_gravity if self.in_water else self.gravity
+            
+            # Jump Logic
+            if (self.current_time - self.jump_buffer_timer < 150):
+                if not self.is_ceiling_above(collision):
+                    is_on_magic = self.active_platform and self.hitbox.colliderect(self.active_platform.rect) and self.vel_y >= 0
+                    
+                    if (self.current_time - self.coyote_timer < 150) and self.jumps_left == 2:
+                        power = self.jump_power - (abs(self.vel_x) * 0.6) if self.is_sliding else self.jump_power
+                        self.execute_jump(max(power, -28))
+                        self.coyote_timer = 0
+                    elif is_on_magic or self.jumps_left > 0:
+                        self.execute_jump(self.jump_power * 0.85)
+                else:
+                    self.jump_buffer_timer = 0
+
+        # Apply Vertical Position
+        start_y = self.hitbox.y
+        self.pos_y += self.vel_y
+        self.hitbox.y = round(self.pos_y)
+        
+        # Reset ground state before checks
+        self.on_ground = False 
+        self.on_solid_ground = False 
+        
+        # 5. COLLISION PRIORITY
+        self.check_collisions(collision, 'y', start_y)
+        self.check_platform_collision() # Magic platform
+        self.check_moving_platforms(moving_platforms) # Moving tiles
+
+        # 6. Recharge Resources
+        if self.on_solid_ground:
+            self.has_platform_charge = True
+            self.jumps_left = 2
+            self.coyote_timer = self.current_time
+        elif self.on_ground: 
+            self.coyote_timer = self.current_time
+
+        # Death / Visuals
+        if self.hitbox.top > max(SH, collision.height_px): self.respawn()
+        self.update_visual_state()
+        self.animate()
+
+    # Hooks for the sprite subclass, the simulation doesn't draw anything
+    def create_ghost(self):
+        """Called every dashing tick."""
+
+    def animate(self):
+        """Called at the end of every tick."""
+
+    def check_moving_platforms(self, moving_platforms, after=-1):
+        """Specifically handles the 'sticky' collision for platforms with velocity.
+
+        moving_platforms is a list, or a SpatialHash to only look at the
+        ones around the hitbox. after is for the hash's re-query once a snap
+        has moved the hitbox: only platforms inserted after that one.
+        """
+        entities = moving_platforms if hasattr(moving_platforms, "query") else None
+        if entities is not None:
+            moving_platforms = entities.query(self.hitbox)
+        for plat in moving_platforms:
+            if entities is not None and entities.order[plat] <= after:
+                continue
+            # We only collide if falling or standing (one-way platform logic)
+            if self.vel_y >= 0:
+                if self.hitbox.colliderect(plat.rect):
+                    # Tolerance check: only snap if player was above the platform top
+                    if (self.hitbox.bottom - self.vel_y) <= plat.rect.top + 15:
+                        # SNAP to top
+                        self.hitbox.bottom = plat.rect.top
+                        self.pos_y = float(self.hitbox.y)
+                        self.vel_y = 0
+                        self.on_ground = True
+                        self.coyote_timer = self.current_time # Add this line
+
+                        # INHERIT MOTION: This is what prevents 'sliding off' or jittering
+                        self.pos_x += plat.velocity.x
+                        self.pos_y += plat.velocity.y
+                        
+                        # Sync hitbox to the float positions immediately
+                        self.hitbox.x = round(self.pos_x)
+                        self.hitbox.y = round(self.pos_y)
+                        
+                        # Recharge
+                        self.has_platform_charge = True
+                        self.jumps_left = 2
+
+                        if entities is not None:
+                            # The list tests the rest against the moved hitbox, which can
+                            # reach platforms the first query didn't cover
+                            self.check_moving_platforms(entities, entities.order[plat])
+                            return
+
+    def check_collisions(self, collision, axis, start=None):
+        """Push the hitbox out of the tiles it overlaps. start is where it
+        was on this axis before the move, for the sweep."""
+        ts = collision.tile_size
+        hb = self.hitbox
+        if start is not None: self.sweep(collision, axis, start)
+        # Nothing overlapping means every tile below would be skipped anyway
+        if not collision.overlaps(hb, SOLID | BRIDGE): return
+        
+        for c, r, flags in collision.cells_in_rect(hb, SOLID | BRIDGE):
+            tile_left, tile_top = c * ts, r * ts
+            
+            # Same test as colliderect, against the hitbox as it is right now
+            if not (hb.left < tile_left + ts and tile_left < hb.right and
+                    hb.top < tile_top + ts and tile_top < hb.bottom): continue
+            self.resolve_tile(axis, flags, tile_left, tile_top, ts)
+
+    def sweep(self, collision, axis, start):
+        # Moving a whole tile or more in one tick the end position alone can
+        # be past a thin wall, or inside the wrong one. Stop at the first
+        # tile along the way instead, slower moves can't tell the difference.
+        hb = self.hitbox
+        ts = collision.tile_size
+        if axis == 'x':
+            moved = hb.x - start
+            if abs(moved) < ts: return
+            hit = collision.sweep_x(Rect(start, hb.y, hb.width, hb.height), moved, SOLID)
+        else:
+            moved = hb.y - start
+            if abs(moved) < ts: return
+            hit = collision.sweep_y(Rect(hb.x, start, hb.width, hb.height), moved, SOLID,
+                                    0 if self.drop_through else BRIDGE)
+        if hit:
+            t, c, r, flags = hit
+            self.resolve_tile(axis, flags, c * ts, r * ts, ts)
+
+    def resolve_tile(self, axis, flags, tile_left, tile_top, ts):
+        hb = self.hitbox
+        if axis == 'x' and flags & SOLID:
+            if self.vel_x > 0: hb.right = tile_left
+            else: hb.left = tile_left + ts
+            self.vel_x, self.pos_x = 0, float(hb.x)
+        
+        elif axis == 'y':
+            if flags & SOLID:
+                if self.vel_y > 0: 
+                    hb.bottom = tile_top
+                    self.on_ground = True
+                    self.on_solid_ground = True 
+                else: 
+                    hb.top = tile_top + ts
+                self.vel_y, self.pos_y = 0, float(hb.y)
+                
+            elif flags & BRIDGE and self.vel_y > 0 and not self.drop_through:
+                if (hb.bottom - self.vel_y) <= tile_top + 10:
+                    hb.bottom = tile_top
+                    self.on_ground = True
+                    
+                    # --- ADD THESE LINES TO REFRESH JUMPS ---
+                    self.jumps_left = 2
+                    self.coyote_timer = self.current_time
+                    # ----------------------------------------
+                    
+                    self.vel_y, self.pos_y = 0, float(hb.y)
+
+    def execute_jump(self, power):
+        self.vel_y = power
+        self.jumps_left -= 1
+        self.on_ground = self.is_sliding = False
+        self.jump_buffer_timer = 0
+        self.last_jump_time = self.current_time
+
+    def handle_platform_placement(self, inputs):
+        if inputs.tapped(DOWN):
+            if not self.on_ground and self.has_platform_charge:
+                self.active_platform = self.platform_class(self.hitbox.centerx - 40, self.hitbox.bottom + 5, now=self.current_time)
+                self.has_platform_charge = False 
+                if self.vel_y > 0: self.vel_y = 0
+
+    def check_platform_collision(self):
+        if self.active_platform and self.vel_y >= 0 and self.current_time - self.last_jump_time > 100:
+            if self.hitbox.colliderect(self.active_platform.rect) and (self.hitbox.bottom - self.vel_y) <= self.active_platform.rect.top + 15:
+                self.hitbox.bottom = self.active_platform.rect.top
+                self.pos_y, self.vel_y, self.on_ground = float(self.hitbox.y), 0, True
+                if self.jumps_left == 0: self.jumps_left = 1
+
+    def is_ceiling_above(self, collision):
+        # A virtual box to check if there is room to stand up
+        ts = collision.tile_size
+        left, top = self.hitbox.x, self.hitbox.bottom - self.height_standing
+        right, bottom = left + self.width_standing, top + self.height_standing - self.height_sliding - 2
+        return collision.any_in_cells(left // ts, top // ts, right // ts, bottom // ts, SOLID)
+
+    def check_liquid(self, collision):
+        ts = collision.tile_size
+        cx, cy = self.hitbox.centerx // ts, self.hitbox.centery // ts
+        self.in_water = bool(collision.flags_at(cx, cy) & LIQUID)
+
+    def check_hazards(self, collision):
+        ts = collision.tile_size
+        for pt in [self.hitbox.center, self.hitbox.midbottom]:
+            cx, cy = int(pt[0] // ts), int(pt[1] // ts)
+            if collision.flags_at(cx, cy) & DAMAGE:
+                self.take_damage(collision.damage_at(cx, cy), (cx * ts) + (ts // 2))
+                break
+
+    def take_damage(self, amount, source_x):
+        if not self.invincible:
+            self.current_hearts -= amount
+            self.invincible = True
+            self.invincibility_timer = self.current_time
+            self.vel_y, self.vel_x = -10, (12 if self.hitbox.centerx > source_x else -12)
+            if self.current_hearts <= 0: self.respawn()
+
+    def handle_horizontal_inputs(self, inputs, move_dir):
+        if move_dir != 0 and not self.is_dashing:
+            self.facing_right = (move_dir > 0)
+        
+        if inputs.tapped(RIGHT):
+            if self.current_time - self.last_d_time < self.double_tap_threshold: self.start_dash(1)
+            self.last_d_time = self.current_time
+        if inputs.tapped(LEFT):
+            if self.current_time - self.last_a_time < self.double_tap_threshold: self.start_dash(-1)
+            self.last_a_time = self.current_time
+        
+        if inputs.held(SLIDE) and self.on_ground and not self.in_water:
+            if not self.is_sliding and (self.is_dashing or abs(self.vel_x) > 0.5 or move_dir != 0):
+                boost_dir = move_dir if move_dir != 0 else (1 if self.facing_right else -1)
+                self.vel_x = boost_dir * (self.speed * 2.5) 
+                self.is_dashing, self.is_sliding = False, True
+
+    def start_dash(self, direction):
+        if self.current_time - self.last_dash_time > self.dash_cooldown:
+            self.is_dashing, self.dash_timer = True, self.current_time
+            self.last_dash_time, self.facing_right = self.current_time, (direction == 1)
+
+    def update_visual_state(self):
+        if self.is_sliding: new_state = "slide"
+        elif self.in_water: new_state = "swim"
+        elif self.is_dashing: new_state = "dash"
+        elif not self.on_ground: new_state = "jump" if self.vel_y < 0 else "fall"
+        elif abs(self.vel_x) > 0.1: new_state = "run"
+        else: new_state = "idle"
+
+        if new_state != self.state:
+            old_b, old_cx = self.hitbox.bottom, self.hitbox.centerx
+            self.state, self.frame_index = new_state, 0
+            self.hitbox.size = (self.width_sliding, self.height_sliding) if self.state == "slide" else (self.width_standing, self.height_standing)
+            self.hitbox.bottom, self.hitbox.centerx = old_b, old_cx
+            self.pos_x, self.pos_y = float(self.hitbox.x), float(self.hitbox.y)
+
+    def warp(self, x, y):
+        """Put the player at (x, y) standing still, for respawns and scripted runs."""
+        self.pos_x, self.pos_y = float(x), float(y)
+        self.hitbox.topleft = (int(self.pos_x), int(self.pos_y))
+        self.prev_centerx, self.prev_bottom = self.hitbox.centerx, self.hitbox.bottom  # no smear across the teleport
+        self.vel_x, self.vel_y = 0, 0
+
+    def respawn(self):
+        self.warp(*self.respawn_point)
+        self.current_hearts = self.max_hearts
+        self.is_dashing = self.is_sliding = False
+        self.has_platform_charge = True
@@ -1,20 +1,19 @@
 import pygame
+import fade_cache
+from platform_body import SummonedPlatformBody
 
-class SummonedPlatform:
-    def __init__(self, x, y, width=64, height=16):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.spawn_time = pygame.time.get_ticks()
-        self.lifetime = 500  # 0.5 seconds
-        self.alpha = 255     # For a fade-out effect
+# Every summoned platform shares these fade frames
+fade_cache.register("summoned_platform", fade_cache.draw_rounded_rect((150, 50, 255), 4))
 
-    def update(self):
-        current_time = pygame.time.get_ticks()
-        progress = (current_time - self.spawn_time) / self.lifetime
-        self.alpha = max(0, 255 - int(progress * 255))
-        return current_time - self.spawn_time < self.lifetime
+class SummonedPlatform(SummonedPlatformBody):
+    def __init__(self, x, y, width=64, height=16, now=None):
+        super().__init__(x, y, width, height, pygame.time.get_ticks() if now is None else now)
 
-    def draw(self, screen, camera_x, camera_y):
+    def update(self, now=None):
+        return super().update(pygame.time.get_ticks() if now is None else now)
+
+    def draw(self, screen, camera_x, camera_y, render_scale=1):
         # Draw a translucent platform
-        surf = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(surf, (150, 50, 255, self.alpha), surf.get_rect(), border_radius=4)
-        screen.blit(surf, (self.rect.x - camera_x, self.rect.y - camera_y))
\ No newline at end of file
+        size = (max(1, int(self.rect.width * render_scale)), max(1, int(self.rect.height * render_scale)))
+        img = fade_cache.get("summoned_platform", size, self.alpha)
+        screen.blit(img, (int((self.rect.x - camera_x) * render_scale), int((self.rect.y - camera_y) * render_scale)))
@@ -0,0 +1,72 @@
+import pygame
+
+class ProfilerOverlay:
+    """Frame-time graph and per-phase p50/p99 for a FrameProfiler, drawn top right.
+
+    Kept cheap enough to leave on: the graph scrolls and only draws the new
+    frames' columns, the table is re-rendered every `refresh` frames from the
+    last `window` frames.
+    """
+    def __init__(self, profiler, width=380, graph_height=90, budget_ms=1000 / 60, refresh=30, window=300):
+        self.profiler = profiler
+        self.visible = False
+        self.width, self.graph_height = width, graph_height
+        self.budget_ms = budget_ms
+        self.ms_per_px = budget_ms * 2 / graph_height  # the graph tops out at two frame budgets
+        self.refresh, self.window = refresh, window
+        self.font = pygame.font.Font(None, 18)
+        self.line_height = self.font.get_linesize()
+
+        # Opaque surfaces with a surface alpha blit much faster than per-pixel alpha
+        self.graph = pygame.Surface((width, graph_height))
+        self.graph.fill((0, 0, 0))
+        self.graph.set_alpha(200)
+        self.graph_count = 0
+        self.table = None
+        self.table_count = -refresh
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def update_graph(self):
+        prof, gh = self.profiler, self.graph_height
+        new = min(prof.count - self.graph_count, self.width)
+        self.graph_count = prof.count
+        if new <= 0:
+            return
+        self.graph.scroll(-new, 0)
+        x0 = self.width - new
+        self.graph.fill((0, 0, 0), (x0, 0, new, gh))
+        budget_y = gh - int(self.budget_ms / self.ms_per_px)
+        for i, ms in enumerate(prof.frame_times_ms(new)):
+            h = min(gh, int(ms / self.ms_per_px))
+            color = (90, 220, 90) if ms <= self.budget_ms * 1.05 else (230, 70, 70)
+            pygame.draw.line(self.graph, color, (x0 + i, gh - 1), (x0 + i, gh - h))
+        pygame.draw.line(self.graph, (255, 255, 0), (x0, budget_y), (self.width - 1, budget_y))
+
+    def update_table(self):
+        stats = self.profiler.summary(self.window)
+        rows = [("phase", "p50", "p99")]
+        rows += [(name, f"{p50:.2f}", f"{p99:.2f}") for name, (p50, p99) in stats.items()]
+        lh = self.line_height
+        self.table = pygame.Surface((self.width, lh * len(rows) + 6))
+        self.table.set_alpha(200)
+        white = (255, 255, 255)
+        for i, (name, p50, p99) in enumerate(rows):
+            y = 3 + i * lh
+            self.table.blit(self.font.render(name, True, white), (6, y))
+            # Right-align the numbers in two fixed columns
+            for text, right in ((p50, self.width - 80), (p99, self.width - 10)):
+                img = self.font.render(text, True, white)
+                self.table.blit(img, (right - img.get_width(), y))
+        self.table_count = self.profiler.count
+
+    def draw(self, surface):
+        if not self.visible:
+            return
+        self.update_graph()
+        if self.table is None or self.profiler.count - self.table_count >= self.refresh:
+            self.update_table()
+        x = surface.get_width() - self.width - 10
+        surface.blit(self.graph, (x, 10))
+        surface.blit(self.table, (x, 10 + self.graph_height))
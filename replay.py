@@ -0,0 +1,279 @@
+"""Input replays: record a run as per-tick action bits, play it back headless.
+
+    python -m replay RUN.pcreplay [more.pcreplay ...] [--jobs N] [--realtime]
+
+File layout (little-endian):
+    HEADER  magic, version, length of the JSON that follows
+    JSON    map, spawn, tile size, screen height, tick rate, platforms,
+            build id, tick count, the hash of the final state and short
+            checkpoint hashes every CHECKPOINT_EVERY ticks
+    body    runs of (action bits: 1 byte, run length: varint)
+
+Only the held bits are stored, just_pressed / just_released come back out of
+InputSnapshot.next() exactly as InputMapper made them. A minute of busy
+play comes to about a kilobyte.
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from input_state import NO_INPUT
+from platform_body import MovingPlatformBody
+from simulation import Simulation
+
+MAGIC = b"PCREPLAY"
+VERSION = 1
+HEADER = struct.Struct("<8sHI")   # magic, version, json length
+SUFFIX = ".pcreplay"
+
+# Runs in a walled level can drift apart and end up in the same spot again,
+# the checkpoints catch that and say roughly when it happened
+CHECKPOINT_EVERY = 300
+CHECKPOINT_CHARS = 8
+
+# What load() insists on before anything reads the header
+HEADER_KEYS = ("map", "spawn", "tile_size", "screen_h", "tick_rate", "platforms", "ticks")
+
+# Files whose code decides the trajectory, a replay recorded on another
+# build may legitimately end somewhere else
+SIM_SOURCES = ["geometry.py", "platform_body.py", "player_body.py", "simulation.py", "collision.py",
+               "input_state.py", "game_loop.py", "tile_grid.py", "maploader.py", "spatial_hash.py"]
+_build_id = None
+
+def build_id():
+    """Short hash of the simulation sources."""
+    global _build_id
+    if _build_id is None:
+        h = hashlib.sha1()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in SIM_SOURCES:
+            with open(os.path.join(here, name), 'rb') as f:
+                h.update(f.read())
+        _build_id = h.hexdigest()[:12]
+    return _build_id
+
+def encode_runs(masks):
+    out = bytearray()
+    i, n = 0, len(masks)
+    while i < n:
+        mask, j = masks[i], i + 1
+        while j < n and masks[j] == mask:
+            j += 1
+        out.append(mask)
+        run = j - i
+        while run >= 0x80:  # LEB128 varint
+            out.append((run & 0x7F) | 0x80)
+            run >>= 7
+        out.append(run)
+        i = j
+    return bytes(out)
+
+def decode_runs(data):
+    masks = bytearray()
+    i, n = 0, len(data)
+    while i < n:
+        mask = data[i]
+        i += 1
+        run = shift = 0
+        while True:
+            if i >= n:
+                raise ValueError("truncated run")
+            b = data[i]
+            i += 1
+            run |= (b & 0x7F) << shift
+            shift += 7
+            if b < 0x80:
+                break
+        masks.extend(bytes((mask,)) * run)
+    return masks
+
+class Replay:
+    def __init__(self, header, masks):
+        self.header = header
+        self.masks = masks  # held action bits, one byte per tick
+
+    def __len__(self):
+        return len(self.masks)
+
+    def inputs(self):
+        """The InputSnapshots the recording saw, one per tick."""
+        snapshot = NO_INPUT
+        for mask in self.masks:
+            snapshot = snapshot.next(mask)
+            yield snapshot
+
+    def simulation(self):
+        """A fresh Simulation set up the way the recording started."""
+        h = self.header
+        platforms = [MovingPlatformBody(a, b, speed, size) for a, b, speed, size in h["platforms"]]
+        return Simulation.from_map(h["map"], h["spawn"], platforms, h["tile_size"], h["screen_h"], h["tick_rate"])
+
+    def save(self, path):
+        header = dict(self.header, ticks=len(self.masks))
+        blob = json.dumps(header, separators=(",", ":")).encode()
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(blob)))
+            f.write(blob)
+            f.write(encode_runs(self.masks))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} replay")
+        start = HEADER.size
+        header = json.loads(data[start:start + size])
+        if not isinstance(header, dict):
+            raise ValueError(f"{path}: header is not a JSON object")
+        missing = [k for k in HEADER_KEYS if k not in header]
+        if missing:
+            raise ValueError(f"{path}: header is missing {', '.join(missing)}")
+        masks = decode_runs(memoryview(data)[start + size:])
+        if len(masks) != header["ticks"]:
+            raise ValueError(f"{path}: {len(masks)} ticks of input, header says {header['ticks']}")
+        return cls(header, masks)
+
+class Recorder:
+    """Collects the snapshots fed to a Simulation, call save() when done.
+
+    Start it before the first tick and call record() after each step,
+    playback begins from a fresh Simulation.
+    """
+    def __init__(self, sim, map_name):
+        if sim.ticks:
+            raise ValueError("start recording before the simulation has run")
+        platforms = [[list(p.start_pos), list(p.end_pos), p.speed_val, list(p.rect.size)] for p in sim.platforms]
+        self.sim = sim
+        self.header = {
+            "map": map_name,
+            "spawn": list(sim.player.respawn_point),
+            "tile_size": sim.collision.tile_size,
+            "screen_h": sim.screen_h,
+            "tick_rate": sim.timestep.tick_rate,
+            "platforms": platforms,
+            "build": build_id(),
+            "checkpoint_every": CHECKPOINT_EVERY,
+        }
+        self.masks = bytearray()
+        self.checkpoints = []
+
+    def record(self, snapshot):
+        """The snapshot the simulation just stepped with."""
+        self.masks.append(snapshot.pressed)
+        if len(self.masks) % CHECKPOINT_EVERY == 0:
+            self.checkpoints.append(self.sim.state_hash()[:CHECKPOINT_CHARS])
+
+    def save(self, path):
+        """Write the recording with the simulation's current state as the expected result."""
+        header = dict(self.header, final_hash=self.sim.state_hash(), checkpoints=self.checkpoints)
+        Replay(header, self.masks).save(path)
+
+def play(replay, realtime=False, sim=None):
+    """Run a replay with rendering off, returns (finished Simulation, checkpoint hashes).
+
+    realtime sleeps between ticks to hold the recorded tick rate, otherwise
+    it goes as fast as it can. sim is replay.simulation() if not given.
+    """
+    if sim is None:
+        sim = replay.simulation()
+    every = replay.header.get("checkpoint_every", 0)
+    checkpoints = []
+    dt = 1 / sim.timestep.tick_rate
+    next_tick = time.perf_counter()
+    for snapshot in replay.inputs():
+        sim.step(snapshot)
+        if every and sim.ticks % every == 0:
+            checkpoints.append(sim.state_hash()[:CHECKPOINT_CHARS])
+        if realtime:
+            next_tick += dt
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    return sim, checkpoints
+
+def verify(path, realtime=False):
+    """Play one replay file and compare its final state, returns a result dict.
+
+    A file that can't be read or parsed comes back as a failure with an
+    "error" field instead of raising, so it can't take the corpus down.
+    """
+    try:
+        replay = Replay.load(path)
+        sim = replay.simulation()   # a header with the keys but junk in them fails here
+    except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+        return {"path": path, "ok": False, "error": str(e), "diverged": None, "ticks": 0,
+                "seconds": 0.0, "expected": None, "actual": None, "same_build": True}
+    start = time.perf_counter()
+    sim, checkpoints = play(replay, realtime, sim)
+    elapsed = time.perf_counter() - start
+    expected = replay.header.get("final_hash")
+    actual = sim.state_hash()
+    # First checkpoint that disagrees, as a tick number
+    diverged = None
+    for i, (a, b) in enumerate(zip(checkpoints, replay.header.get("checkpoints", []))):
+        if a != b:
+            diverged = (i + 1) * replay.header["checkpoint_every"]
+            break
+    return {
+        "path": path,
+        "ok": actual == expected and diverged is None,
+        "diverged": diverged,
+        "ticks": len(replay),
+        "seconds": elapsed,
+        "expected": expected,
+        "actual": actual,
+        "same_build": replay.header.get("build") == build_id(),
+    }
+
+def run_corpus(paths, jobs=None, realtime=False):
+    """verify() every replay, spread over a process pool. Results keep the input order."""
+    if jobs == 1:
+        return [verify(p, realtime) for p in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(verify, paths, [realtime] * len(paths)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check replays against their recorded final state")
+    parser.add_argument("paths", nargs="+", help="replay files or directories of them")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--realtime", action="store_true", help="play at the recorded tick rate instead of flat out")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for p in args.paths:
+        if os.path.isdir(p):
+            paths += sorted(os.path.join(p, n) for n in os.listdir(p) if n.endswith(SUFFIX))
+        else:
+            paths.append(p)
+
+    start = time.perf_counter()
+    results = run_corpus(paths, args.jobs, args.realtime)
+    wall = time.perf_counter() - start
+    failed = 0
+    for r in results:
+        status = "ok  " if r["ok"] else "FAIL"
+        if "error" in r:
+            print(f"{status} {r['path']}: {r['error']}")
+            failed += 1
+            continue
+        note = "" if r["same_build"] else "  (recorded on another build)"
+        if r["diverged"] is not None:
+            note += f"  (diverged by tick {r['diverged']})"
+        print(f"{status} {r['path']}: {r['ticks']} ticks in {r['seconds']:.2f} s "
+              f"({r['ticks'] / max(r['seconds'], 1e-9):,.0f} ticks/s){note}")
+        failed += not r["ok"]
+    total = sum(r["ticks"] for r in results)
+    print(f"{len(results) - failed}/{len(results)} passed, {total} ticks in {wall:.2f} s wall")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
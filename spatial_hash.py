@@ -0,0 +1,128 @@
+"""Uniform grid broadphase for things that move around the world.
+
+    entities = SpatialHash(cell_size=256)
+    entities.insert(plat)          # anything with a .rect in world pixels
+    ...
+    entities.update(plat)          # after it moved, cheap if it stayed in its cells
+    entities.update_many(platforms)  # or the whole lot once a tick
+    for plat in entities.query(player.hitbox):
+        ...
+
+Queries hand back candidates, whatever shares a cell with the box, in the
+order they were inserted so results don't depend on the hashing. Callers
+still do the exact rect test. No pygame in here.
+"""
+
+class SpatialHash:
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self.cells = {}    # (cx, cy) -> {entity: insertion number}
+        self.spans = {}    # entity -> (cx0, cy0, cx1, cy1) it's filed under, inclusive
+        self.order = {}    # entity -> insertion number
+        self.next_order = 0
+
+        # Counters, see stats()
+        self.queries = 0
+        self.candidates = 0
+        self.moves = 0     # updates that had to refile an entity
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __iter__(self):
+        """Every entity, in insertion order."""
+        return iter(self.order)
+
+    def __contains__(self, entity):
+        return entity in self.spans
+
+    def span(self, left, top, right, bottom):
+        cs = self.cell_size
+        return left // cs, top // cs, (right - 1) // cs, (bottom - 1) // cs
+
+    def _file(self, entity, span, number):
+        cx0, cy0, cx1, cy1 = span
+        cells = self.cells
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    bucket = cells[(cx, cy)] = {}
+                bucket[entity] = number
+
+    def _unfile(self, entity, span):
+        cx0, cy0, cx1, cy1 = span
+        cells = self.cells
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells[(cx, cy)]
+                del bucket[entity]
+                if not bucket:
+                    del cells[(cx, cy)]
+
+    def insert(self, entity):
+        if entity in self.spans:
+            raise ValueError(f"{entity!r} is already in the hash")
+        r = entity.rect
+        span = self.span(r.left, r.top, r.right, r.bottom)
+        number = self.order[entity] = self.next_order
+        self.next_order += 1
+        self.spans[entity] = span
+        self._file(entity, span, number)
+
+    def remove(self, entity):
+        self._unfile(entity, self.spans.pop(entity))
+        del self.order[entity]
+
+    def update(self, entity):
+        """Refile entity after its rect moved. Most moves stay inside the same cells."""
+        self.update_many((entity,))
+
+    def update_many(self, entities):
+        """update() for a batch, the per-tick path for everything that moves."""
+        cs, spans = self.cell_size, self.spans
+        for entity in entities:
+            r = entity.rect
+            x, y = r.x, r.y
+            span = (x // cs, y // cs, (x + r.w - 1) // cs, (y + r.h - 1) // cs)
+            old = spans[entity]
+            if span != old:
+                self._unfile(entity, old)
+                self._file(entity, span, self.order[entity])
+                spans[entity] = span
+                self.moves += 1
+
+    def query_box(self, left, top, right, bottom):
+        """Entities filed in any cell the box touches, in insertion order."""
+        cs, cells = self.cell_size, self.cells
+        found = None
+        for cy in range(top // cs, (bottom - 1) // cs + 1):
+            for cx in range(left // cs, (right - 1) // cs + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    if found is None:
+                        found = dict(bucket)
+                    else:
+                        found.update(bucket)
+        self.queries += 1
+        if not found:
+            return ()
+        self.candidates += len(found)
+        if len(found) == 1:
+            return list(found)
+        return sorted(found, key=found.__getitem__)
+
+    def query(self, rect):
+        return self.query_box(rect.left, rect.top, rect.right, rect.bottom)
+
+    def stats(self):
+        return {
+            "entities": len(self.spans),
+            "cells": len(self.cells),
+            "queries": self.queries,
+            "candidates": self.candidates,
+            "moves": self.moves,
+        }
+
+    def reset_counters(self):
+        self.queries = self.candidates = self.moves = 0
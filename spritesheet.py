@@ -1,44 +1,45 @@
-import pygame
+from assets import ASSETS
 
 class SpriteSheet:
-    def __init__(self, filename, colorkey=None):
-        """Load the sheet and handle transparency."""
-        try:
-            # Use convert_alpha() to support modern PNG transparency
-            self.sheet = pygame.image.load(filename).convert_alpha()
-            if colorkey is not None:
-                self.sheet.set_colorkey(colorkey)
-        except pygame.error as e:
-            print(f"Unable to load spritesheet image: {filename}")
-            raise SystemExit(e)
+    def __init__(self, filename, colorkey=None, assets=None):
+        """Load the sheet and handle transparency.
 
-    def get_image(self, x, y, width, height, rotation=0, scale=1, colorkey=None):
-        """Extracts a single image from the sheet."""
-        # Create a surface that supports transparency (SRCALPHA)
-        image = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
+        The sheet and every image cut from it come out of an AssetManager
+        (or a stage's scope of one), shared with anyone else using the same
+        file, so don't draw on them. The sheet itself is only decoded once
+        an image isn't already resident or in the disk cache.
+        """
+        self.assets = ASSETS if assets is None else assets
+        self.filename = filename
+        self.colorkey = colorkey
+        self._sheet = None
 
-        # Blit the specific portion
-        image.blit(self.sheet, (0, 0), (x, y, width, height))
+    @property
+    def sheet(self):
+        if self._sheet is None:
+            self._sheet = self.assets.sheet(self.filename, self.colorkey)
+        return self._sheet
 
-        if colorkey:
-            image.set_colorkey(colorkey)
+    def get_size(self):
+        if self._sheet is not None:
+            return self._sheet.get_size()
+        return self.assets.sheet_size(self.filename, self.colorkey)
 
-        # Handle scaling
-        if scale != 1:
-            # Using int casting to ensure valid dimensions
-            new_size = (int(width * scale), int(height * scale))
-            # Use 'scale' for pixel art to keep it crisp, or 'smoothscale' for HD
-            image = pygame.transform.scale(image, new_size)
-        
-        if rotation != 0:
-            image = pygame.transform.rotate(image, rotation)
+    def get_image(self, x, y, width, height, rotation=0, scale=1, colorkey=None, flip=False):
+        """Extracts a single image from the sheet, flip mirrors it left to right."""
+        args = (self.filename, (x, y, width, height), scale, colorkey, rotation, self.colorkey, flip)
+        if self._sheet is None and not self.assets.cached(*args):
+            self.sheet  # about to cut, keep the sheet around for the rest
+        return self.assets.image(*args)
 
-        return image
-
-    def get_strip(self, y, count, width, height, scale, colorkey=None):
+    def get_strip(self, y, count, width, height, scale, colorkey=None, flip=False):
         """Extracts a horizontal row of sprites."""
         frames = []
         for i in range(max(1, count)):
             # Important: i * width moves horizontally across the row 'y'
-            frames.append(self.get_image(i * width, y, width, height, 0, scale, colorkey))
-        return frames
\ No newline at end of file
+            frames.append(self.get_image(i * width, y, width, height, 0, scale, colorkey, flip))
+        return frames
+
+    def release(self, image):
+        """Hand back an image from get_image() once it's no longer used."""
+        self.assets.release(image)
@@ -0,0 +1,64 @@
+import pygame
+from collections import Counter
+
+# pygame.transform functions that return a brand new Surface
+TRANSFORMS = ("flip", "scale", "scale_by", "smoothscale", "smoothscale_by",
+              "rotate", "rotozoom", "scale2x", "chop", "laplacian")
+
+class SurfaceCounter:
+    """Counts Surfaces created through pygame.Surface() and pygame.transform while active.
+
+        with SurfaceCounter() as allocs:
+            player.draw(screen, 0, 0)
+        print(allocs.count, allocs.by_source)
+
+    Surface methods (copy, convert, subsurface) live on the C type and can't be
+    hooked, so those are not counted. Transforms given a dest surface don't
+    allocate and aren't counted either.
+    """
+    def __init__(self):
+        self.count = 0
+        self.by_source = Counter()
+        self._saved = {}
+
+    def reset(self):
+        self.count = 0
+        self.by_source.clear()
+
+    def _hit(self, source):
+        self.count += 1
+        self.by_source[source] += 1
+
+    def __enter__(self):
+        counter = self
+        original_surface = pygame.Surface
+
+        class CountedSurface(original_surface):
+            def __init__(self, *args, **kwargs):
+                counter._hit("Surface")
+                super().__init__(*args, **kwargs)
+
+        self._saved["Surface"] = (pygame, original_surface)
+        pygame.Surface = CountedSurface
+
+        for name in TRANSFORMS:
+            fn = getattr(pygame.transform, name, None)
+            if fn is None:
+                continue
+            self._saved[name] = (pygame.transform, fn)
+            setattr(pygame.transform, name, self._wrap(name, fn))
+        return self
+
+    def _wrap(self, name, fn):
+        def counted(surface, *args, **kwargs):
+            # scale(surf, size, dest) and friends write into dest instead of allocating
+            if "dest_surface" not in kwargs and not (name in ("scale", "smoothscale") and len(args) >= 2):
+                self._hit(name)
+            return fn(surface, *args, **kwargs)
+        return counted
+
+    def __exit__(self, *exc):
+        for name, (module, original) in self._saved.items():
+            setattr(module, name, original)
+        self._saved.clear()
+        return False
@@ -0,0 +1,81 @@
+from array import array
+
+# Marks a cell with no tile, same as -1 in the Tiled CSV export
+EMPTY = -1
+
+class TileGrid:
+    """Tile IDs for a whole map in one contiguous, typed array (row-major).
+
+    Reads like the old list of lists: grid[r][c], len(grid), len(grid[0]),
+    iterating rows and slicing rows all work, but rows are memoryviews into
+    the same buffer instead of lists of boxed ints.
+    """
+    def __init__(self, cols, rows, cells=None, typecode='h', name="", offset=(0, 0)):
+        if cells is None:
+            cells = array(typecode, [EMPTY]) * (cols * rows)
+        if len(cells) != cols * rows:
+            raise ValueError(f"TileGrid needs {cols * rows} cells, got {len(cells)}")
+        self.cols, self.rows = cols, rows
+        self.cells = cells
+        self.view = memoryview(cells)
+        self.name = name
+        self.offset = offset    # layer offset in unscaled map pixels
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a grid from lists of ints, short rows are padded with EMPTY."""
+        cols = max((len(r) for r in rows), default=0)
+        cells = array('i')
+        for r in rows:
+            cells.extend(r)
+            if len(r) < cols:
+                cells.extend([EMPTY] * (cols - len(r)))
+        return cls(cols, len(rows), compact(cells))
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    @property
+    def nbytes(self):
+        return self.view.nbytes
+
+    def __len__(self):
+        return self.rows
+
+    def __bool__(self):
+        return self.rows > 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.rows)
+            if step != 1:
+                return [self[r] for r in range(start, stop, step)]
+            stop = max(start, stop)
+            return TileGrid(self.cols, stop - start, self.view[start * self.cols:stop * self.cols])
+        if key < 0:
+            key += self.rows
+        if not 0 <= key < self.rows:
+            raise IndexError("TileGrid row out of range")
+        return self.view[key * self.cols:(key + 1) * self.cols]
+
+    def __iter__(self):
+        for r in range(self.rows):
+            yield self.view[r * self.cols:(r + 1) * self.cols]
+
+    def get(self, row, col, default=EMPTY):
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.view[row * self.cols + col]
+        return default
+
+    def unique_ids(self):
+        """Every tile ID used on the map, without EMPTY."""
+        ids = set(self.view)
+        ids.discard(EMPTY)
+        return ids
+
+def compact(cells):
+    """Shrink an array('i') to int16 when every ID fits."""
+    if not cells or (min(cells) >= -32768 and max(cells) <= 32767):
+        return array('h', cells)
+    return cells
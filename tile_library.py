@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+class TileLibrary:
+    """Cuts and scales map tiles on demand instead of slicing the whole sheet.
+
+    Behaves like the old {tile_id: Surface} dict for `in` and `[]`, but only
+    keeps the `max_tiles` most recently used tiles alive.
+    """
+    def __init__(self, spritesheet, tilesize, scale, colorkey=None, max_tiles=512):
+        self.spritesheet = spritesheet
+        self.tilesize = tilesize
+        self.scale = scale
+        self.colorkey = colorkey
+        self.max_tiles = max_tiles
+
+        sheet_w, sheet_h = spritesheet.get_size()
+        self.cols = sheet_w // tilesize
+        self.tile_count = self.cols * (sheet_h // tilesize)
+
+        self.tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, tid):
+        return 0 <= tid < self.tile_count
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __getitem__(self, tid):
+        img = self.tiles.get(tid)
+        if img is not None:
+            self.hits += 1
+            self.tiles.move_to_end(tid)
+            return img
+
+        if tid not in self:
+            raise KeyError(tid)
+        self.misses += 1
+        img = self._cut(tid)
+        self.tiles[tid] = img
+        if len(self.tiles) > self.max_tiles:
+            self.evict()
+        return img
+
+    def _cut(self, tid):
+        # Tiled IDs start at 0 and run left to right, top to bottom
+        x = (tid % self.cols) * self.tilesize
+        y = (tid // self.cols) * self.tilesize
+        return self.spritesheet.get_image(x, y, self.tilesize, self.tilesize, 0, self.scale, self.colorkey)
+
+    def warm(self, tile_ids):
+        """Build the given tiles up front so the first frames don't stall."""
+        for tid in tile_ids:
+            if tid in self and tid not in self.tiles:
+                self.tiles[tid] = self._cut(tid)
+                self.misses += 1
+        # Warming more than the limit just keeps the last ones
+        while len(self.tiles) > self.max_tiles:
+            self.evict()
+
+    def evict(self):
+        # The asset manager frees the image unless something else holds it
+        _, img = self.tiles.popitem(last=False)
+        self.spritesheet.release(img)
+        self.evictions += 1
+
+    def resident_bytes(self):
+        return sum(img.get_pitch() * img.get_height() for img in self.tiles.values())
+
+    def stats(self):
+        return {
+            "resident": len(self.tiles),
+            "resident_bytes": self.resident_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }